@@ -0,0 +1,171 @@
+import json
+import os
+import shutil
+import sys
+import time
+from collections.abc import Mapping
+import numpy as np
+try:
+    from .tree_engine import CompiledForest
+except ImportError:
+    from tree_engine import CompiledForest
+
+# Versioned model artifact: a directory holding the compiled tree arrays as raw
+# .npy files plus JSON for everything else. Nothing is pickled, so artifacts
+# survive sklearn upgrades, and the arrays are memory-mapped read-only on load
+# so every worker process shares one page-cached copy.
+#
+#   race_predictor_<version>/
+#       manifest.json          format version, metadata, forest shapes
+#       encoders.json          driver/team LabelEncoder classes
+#       stats.json             driver_stats / team_stats
+#       position_model/*.npy   CompiledForest arrays
+#       win_prob_model/*.npy
+FORMAT_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+FORESTS = ('position_model', 'win_prob_model')
+
+
+# The part of a fitted LabelEncoder that serving uses, without sklearn:
+# classes_ in code order (appended classes keep their codes, so it need not
+# be sorted) and transform.
+class FittedLabels:
+    def __init__(self, classes=()):
+        self.classes_ = np.asarray(classes, dtype=object)
+
+    def transform(self, values):
+        codes = {label: i for i, label in enumerate(self.classes_)}
+        try:
+            return np.array([codes[value] for value in values], dtype=np.int64)
+        except KeyError as e:
+            raise ValueError(f"y contains previously unseen labels: {e}") from None
+
+
+def is_artifact(path):
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, MANIFEST_NAME))
+
+
+def _plain(value):
+    # numpy scalars from pandas aggregations -> JSON-native values
+    if isinstance(value, Mapping):
+        return {str(k): _plain(v) for k, v in value.items()}
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    return value
+
+
+def _write_json(path, payload):
+    with open(path, 'w') as f:
+        json.dump(payload, f, indent=1)
+
+
+def _read_json(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_artifact(predictor, path, metrics=None):
+    # Written into a temporary sibling directory and renamed into place, so a
+    # reader never sees a half-written artifact.
+    import sklearn
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        shutil.rmtree(tmp_path)
+    os.makedirs(tmp_path)
+
+    forests = {}
+    for name in FORESTS:
+        model = getattr(predictor, name)
+        forest = model if isinstance(model, CompiledForest) else CompiledForest.from_estimator(model)
+        arrays, meta = forest.to_arrays()
+        os.makedirs(os.path.join(tmp_path, name))
+        for array_name, array in arrays.items():
+            np.save(os.path.join(tmp_path, name, f'{array_name}.npy'), np.ascontiguousarray(array))
+        forests[name] = meta
+
+    _write_json(os.path.join(tmp_path, 'encoders.json'), {
+        'driver': [str(c) for c in predictor.le_driver.classes_],
+        'team': [str(c) for c in predictor.le_team.classes_]
+    })
+    _write_json(os.path.join(tmp_path, 'stats.json'), {
+        'driver_stats': _plain(predictor.driver_stats),
+        'team_stats': _plain(predictor.team_stats)
+    })
+    _write_json(os.path.join(tmp_path, MANIFEST_NAME), {
+        'format_version': FORMAT_VERSION,
+        'model_class': type(predictor).__name__,
+        'version': os.path.basename(os.path.normpath(path)),
+        'created_at': time.time(),
+        'sklearn_version': sklearn.__version__,
+        'feature_names': list(predictor.feature_names),
+        'metrics': _plain(metrics or {}),
+        'forests': forests,
+        # Rounds the model has seen, so it can later be updated incrementally.
+        'rounds': [[int(year), int(round_num)] for year, round_num in getattr(predictor, 'trained_rounds', None) or []],
+        'parent_version': getattr(predictor, 'parent_version', None)
+    })
+
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_artifact(path, mmap=True):
+    manifest = _read_json(os.path.join(path, MANIFEST_NAME))
+    if manifest.get('format_version') != FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported model artifact format {manifest.get('format_version')} in {path}"
+        )
+
+    mmap_mode = 'r' if mmap else None
+    forests = {}
+    for name, meta in manifest['forests'].items():
+        arrays = {
+            array_name: np.load(os.path.join(path, name, f'{array_name}.npy'), mmap_mode=mmap_mode)
+            for array_name in CompiledForest.ARRAYS
+        }
+        forests[name] = CompiledForest.from_arrays(arrays, meta)
+
+    encoders = _read_json(os.path.join(path, 'encoders.json'))
+    stats = _read_json(os.path.join(path, 'stats.json'))
+    return {
+        'manifest': manifest,
+        'forests': forests,
+        'driver_classes': np.array(encoders['driver'], dtype=object),
+        'team_classes': np.array(encoders['team'], dtype=object),
+        'driver_stats': stats['driver_stats'],
+        'team_stats': stats['team_stats'],
+        'feature_names': manifest['feature_names'],
+        'rounds': [tuple(r) for r in manifest.get('rounds', [])]
+    }
+
+
+def artifact_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path) for name in names
+    )
+
+
+def convert_legacy(joblib_path, path):
+    # One-off migration of a pickled RacePredictor (needs a compatible sklearn).
+    import joblib
+    legacy = joblib.load(joblib_path)
+    return save_artifact(legacy, path)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] != 'convert':
+        print("Usage: python -m backend.artifacts convert <legacy.joblib> <artifact_dir>")
+        sys.exit(1)
+
+    output = convert_legacy(sys.argv[2], sys.argv[3])
+    print(f"Wrote {output} ({artifact_size(output) / 1e6:.1f} MB, "
+          f"legacy {artifact_size(sys.argv[2]) / 1e6:.1f} MB)")
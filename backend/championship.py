@@ -0,0 +1,157 @@
+from datetime import datetime
+import numpy as np
+try:
+    from . import data_service, simulation
+    from .cache import TTLCache
+except ImportError:
+    import data_service
+    import simulation
+    from cache import TTLCache
+
+PROJECTION_SIMULATIONS = 10000
+# Simulation counts are part of the cache keys, so requests are rounded up
+# to one of these sizes instead of keying on any number a caller sends.
+PROJECTION_SIMULATION_SIZES = (1000, 5000, PROJECTION_SIMULATIONS)
+# A round's simulation only depends on the model, the lineup and the grid, so
+# it stays valid until one of those changes; completed rounds simply stop
+# being asked for.
+ROUND_SIMULATION_TTL = 7 * 24 * 3600
+
+# A season's remaining rounds at each size, for the serving model and the
+# one before it (10000 x 20 uint8 points = 200 KB per round).
+_round_simulation_cache = TTLCache('round_simulations', maxsize=2 * len(PROJECTION_SIMULATION_SIZES) * 24)
+_projection_cache = TTLCache('championship_projection', maxsize=16)
+
+
+def cache_stats():
+    return [cache.stats() for cache in (_round_simulation_cache, _projection_cache)]
+
+
+def projection_simulations(n_sims):
+    for size in PROJECTION_SIMULATION_SIZES:
+        if n_sims <= size:
+            return size
+    return PROJECTION_SIMULATION_SIZES[-1]
+
+
+def _season_entries(predictor, last_results):
+    # The latest lineup, gridded by each driver's average qualifying position
+    # in the model's stats; drivers the model hasn't seen line up behind, in
+    # the order they started the last race.
+    rows = []
+    for row in last_results.itertuples():
+        stats = predictor.driver_stats.get(row.driver)
+        rows.append(((0, stats['avg_grid']) if stats else (1, row.grid_position or 99), row.driver, row.team))
+    rows.sort()
+    return [{'driver': driver, 'team': team, 'grid': i + 1} for i, (_, driver, team) in enumerate(rows)]
+
+
+def _round_points(predictor, year, round_num, entries, n_sims):
+    key = (
+        predictor.version, year, int(round_num), n_sims,
+        tuple((e['driver'], e['team'], e['grid']) for e in entries)
+    )
+
+    def load():
+        # Seeded per round so a projection is reproducible between refreshes.
+        _, _, points = simulation.simulate_outcomes(predictor, entries, n_sims, seed=year * 100 + int(round_num))
+        return points.astype(np.uint8), ROUND_SIMULATION_TTL
+
+    return _round_simulation_cache.get_or_load(key, load)
+
+
+def _load_projection(predictor, year, n_sims):
+    now = datetime.now()
+    schedule = data_service.get_event_schedule(year)
+    completed = data_service.completed_rounds(schedule, now)
+    remaining = data_service.remaining_rounds(schedule, now)
+
+    current_points = {}
+    wins = {}
+    teams = {}
+    last_results = None
+    for event in completed.itertuples():
+        results = data_service.get_round_results(year, event.RoundNumber, event.EventDate)
+        for row in results.itertuples():
+            current_points[row.driver] = current_points.get(row.driver, 0.0) + row.points
+            wins[row.driver] = wins.get(row.driver, 0) + int(row.finish_position == 1)
+            teams[row.driver] = row.team
+        if len(results):
+            last_results = results
+
+    projection = {
+        'season': year,
+        'model_version': predictor.version,
+        'n_simulations': n_sims,
+        'completed_rounds': int(len(completed)),
+        'remaining_rounds': [
+            {'round': int(event.RoundNumber), 'race_name': event.EventName}
+            for event in remaining.itertuples()
+        ],
+        'drivers': []
+    }
+    if last_results is None:
+        # Nothing raced yet, or no classification published yet: there is no
+        # lineup to simulate.
+        return projection, data_service.RESULTS_RECHECK_TTL if len(completed) else data_service.SCHEDULE_TTL
+
+    entries = _season_entries(predictor, last_results)
+    if not entries:
+        return projection, data_service.RESULTS_RECHECK_TTL
+    drivers = list(current_points)
+    for entry in entries:
+        if entry['driver'] not in current_points:
+            drivers.append(entry['driver'])
+            teams[entry['driver']] = entry['team']
+    column = {driver: i for i, driver in enumerate(drivers)}
+    entry_columns = np.array([column[e['driver']] for e in entries], dtype=np.intp)
+
+    totals = np.tile(np.array([current_points.get(d, 0.0) for d in drivers]), (n_sims, 1))
+    for event in remaining.itertuples():
+        totals[:, entry_columns] += _round_points(predictor, year, event.RoundNumber, entries, n_sims)
+
+    # Title: highest total, ties broken at random.
+    rng = np.random.default_rng(year)
+    champion = np.argmax(totals + rng.random(totals.shape) * 1e-3, axis=1)
+    title_probability = np.bincount(champion, minlength=len(drivers)) / n_sims
+    order = np.argsort(-(totals + rng.random(totals.shape) * 1e-3), axis=1)
+    final_position = np.empty_like(order)
+    np.put_along_axis(final_position, order, np.arange(1, len(drivers) + 1), axis=1)
+    low, median, high = np.percentile(totals, [10, 50, 90], axis=0)
+
+    for i, driver in enumerate(drivers):
+        projection['drivers'].append({
+            'driver': driver,
+            'team': teams.get(driver, ''),
+            'current_points': float(current_points.get(driver, 0.0)),
+            'wins': wins.get(driver, 0),
+            'expected_points': round(float(totals[:, i].mean()), 2),
+            'points_p10': float(low[i]),
+            'points_p50': float(median[i]),
+            'points_p90': float(high[i]),
+            'title_probability': round(float(title_probability[i]), 4),
+            'expected_position': round(float(final_position[:, i].mean()), 2)
+        })
+    projection['drivers'].sort(key=lambda d: -d['expected_points'])
+
+    last_event = completed.iloc[-1]
+    return projection, data_service.results_ttl(schedule, last_event['EventDate'], now)
+
+
+def get_projection(predictor, year=data_service.CURRENT_YEAR, n_sims=PROJECTION_SIMULATIONS):
+    n_sims = projection_simulations(n_sims)
+    return _projection_cache.get_or_load(
+        (year, predictor.version, n_sims), lambda: _load_projection(predictor, year, n_sims)
+    )
+
+
+async def get_projection_async(predictor, year=data_service.CURRENT_YEAR, n_sims=PROJECTION_SIMULATIONS,
+                               timeout=data_service.IO_TIMEOUT_SECONDS):
+    # The first projection of a season loads every completed round, so it goes
+    # through the same background-refresh path as the standings.
+    n_sims = projection_simulations(n_sims)
+    key = (year, predictor.version, n_sims)
+    return await data_service.serve_cached(
+        f'projection:{key}', _projection_cache, key,
+        lambda: get_projection(predictor, year, n_sims), timeout
+    )
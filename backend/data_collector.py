@@ -2,152 +2,308 @@ import fastf1
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import os
 import pickle
+import time
+import tracemalloc
+try:
+    from .lap_features import summarize_laps
+    from .round_store import RoundStore
+except ImportError:
+    from lap_features import summarize_laps
+    from round_store import RoundStore
 
-class F1DataCollector:
-    def __init__(self, cache_dir='f1_cache'):
-        self.cache_dir = cache_dir
-        os.makedirs(cache_dir, exist_ok=True)
-
+# Raw columns engineer_features and model training actually read.
+FEATURE_SOURCE_COLUMNS = [
+    'year', 'round', 'driver', 'team', 'grid_position', 'finish_position', 'points', 'status'
+]
 
+# Training rows only read session.results; skip laps, telemetry, weather and
+# race control messages.
+RESULTS_ONLY = {'laps': False, 'telemetry': False, 'weather': False, 'messages': False}
 
 
+class F1DataCollector:
+    def __init__(self, cache_dir='f1_cache', session_provider=None, max_workers=4,
+                 max_retries=3, retry_backoff=2.0, store_format=None):
+        self.cache_dir = cache_dir
+        self.store_format = store_format
+        os.makedirs(cache_dir, exist_ok=True)
+        
+        # Anything exposing fastf1's get_event_schedule/get_session can stand in
+        # for the real API (e.g. an offline stub).
+        self.session_provider = session_provider or fastf1
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        
+    def collect_historical_data(self, start_year=2025, end_year=2025, max_workers=None, refresh=False,
+                                columns=None):
+        store = self.round_store()
+        self._import_legacy_caches(store)
+        
+        events = self._list_events(start_year, end_year)
+        missing = [
+            event for event in events
+            if refresh or not store.is_current(event[0], event[1], self._fingerprint(event))
+        ]
         
-    def collect_historical_data(self, start_year=2025, end_year=2025):
-        cache_file = os.path.join(self.cache_dir, f'training_data_{start_year}_{end_year}.pkl')
+        if missing:
+            print(f"Collecting {len(missing)} missing round(s) between {start_year} and {end_year}...")
+            fetched = self._collect_events(missing, max_workers or self.max_workers)
+            
+            # Rounds that failed to load are left out and retried on the next call.
+            for event in missing if not fetched.empty else []:
+                year, round_num = event[0], event[1]
+                part = fetched[(fetched['year'] == year) & (fetched['round'] == round_num)]
+                if not part.empty:
+                    store.write(year, round_num, part, self._fingerprint(event))
+        else:
+            print(f"Training data for {start_year}-{end_year} is up to date in {store.root}")
+        
+        df = store.load(start_year, end_year, columns=columns)
+        print(f"Loaded {len(df)} race entries from {len(store.rounds(start_year, end_year))} cached round(s)")
+        return df
+    
+    def round_store(self):
+        return RoundStore(os.path.join(self.cache_dir, 'rounds'), format=self.store_format)
+    
+    def lap_store(self):
+        return RoundStore(os.path.join(self.cache_dir, 'lap_summaries'), format=self.store_format)
+    
+    def collect_lap_summaries(self, start_year=2025, end_year=2025, refresh=False, trace_memory=False):
+        # Streams race laps one session at a time: each session is loaded
+        # (laps only, no car telemetry), reduced to per-driver summaries,
+        # written to the lap store and released before the next one loads.
+        # The summaries are stored for analysis and are not model inputs yet.
+        # trace_memory reports each session's peak allocation through
+        # tracemalloc, which slows ingestion several times over.
+        store = self.lap_store()
+        events = self._list_events(start_year, end_year)
+        missing = [
+            event for event in events
+            if refresh or not store.is_current(event[0], event[1], self._fingerprint(event))
+        ]
+        
+        reports = []
+        if missing:
+            print(f"Summarizing laps for {len(missing)} round(s) between {start_year} and {end_year}...")
+        for event in missing:
+            report = self._ingest_laps(store, event, trace_memory)
+            if report is not None:
+                reports.append(report)
         
-        if os.path.exists(cache_file):
-            print(f"Loading cached training data from {cache_file}")
-            with open(cache_file, 'rb') as f:
-                return pickle.load(f)
+        if reports and trace_memory:
+            print(f"Peak lap-ingestion memory: {max(r['peak_mb'] for r in reports):.1f} MB per session")
+        return reports
+    
+    def _ingest_laps(self, store, event, trace_memory):
+        year, round_num, event_name, _ = event
+        started_tracing = trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if trace_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
         
-        print(f"Collecting F1 data from {start_year} to {end_year}...")
-        all_race_data = []
+        try:
+            session = self._load_session(
+                event, 'R', laps=True, telemetry=False, weather=False, messages=False
+            )
+            laps = session.laps
+            lap_count = len(laps)
+            summary = summarize_laps(laps)
+            del session, laps
+        except Exception as e:
+            print(f"    Error summarizing laps for {event_name}: {e}")
+            return None
+        finally:
+            peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+            if started_tracing:
+                tracemalloc.stop()
         
+        if summary.empty:
+            return None
+        summary.insert(0, 'round', round_num)
+        summary.insert(0, 'year', year)
+        store.write(year, round_num, summary, self._fingerprint(event))
+        
+        report = {
+            'year': year,
+            'round': round_num,
+            'laps': lap_count,
+            'drivers': len(summary),
+            'seconds': time.perf_counter() - start,
+            'peak_mb': peak / 2**20 if peak is not None else None
+        }
+        print(f"  {event_name}: {lap_count} laps -> {len(summary)} driver summaries "
+              f"in {report['seconds']:.1f}s" + (f", peak {report['peak_mb']:.1f} MB" if trace_memory else ""))
+        return report
+    
+    def _import_legacy_caches(self, store):
+        # One-off migration of the old monolithic training_data_{start}_{end}.pkl files.
+        for name in sorted(os.listdir(self.cache_dir)):
+            if not (name.startswith('training_data_') and name.endswith('.pkl')):
+                continue
+            with open(os.path.join(self.cache_dir, name), 'rb') as f:
+                legacy = pickle.load(f)
+            imported = store.import_frame(legacy) if not legacy.empty else 0
+            if imported:
+                print(f"Imported {imported} round(s) from legacy cache {name}")
+    
+    @staticmethod
+    def _fingerprint(event):
+        year, round_num, event_name, event_date = event
+        return f"{event_name}|{event_date}"
+    
+    def _list_events(self, start_year, end_year):
+        now = datetime.now()
+        events = []
         for year in range(start_year, end_year + 1):
             print(f"Processing {year} season...")
             try:
-                schedule = fastf1.get_event_schedule(year)
-                
-                for idx, event in schedule.iterrows():
-                    if event['EventFormat'] != 'conventional':
-                        continue
-                    
-                    round_num = event['RoundNumber']
-                    event_name = event['EventName']
-                    
-                    try:
-                        print(f"  Fetching {event_name} (Round {round_num})...")
-                        
-                        quali_session = fastf1.get_session(year, round_num, 'Q')
-                        race_session = fastf1.get_session(year, round_num, 'R')
-                        
-                        quali_session.load()
-                        race_session.load()
-                        
-                        quali_results = quali_session.results
-                        race_results = race_session.results
-                        
-                        for i, race_row in race_results.iterrows():
-                            driver_abbr = race_row['Abbreviation']
-                            
-                            quali_row = quali_results[quali_results['Abbreviation'] == driver_abbr]
-                            
-                            if quali_row.empty:
-                                continue
-                            
-                            quali_row = quali_row.iloc[0]
-                            
-                            grid_pos = race_row['GridPosition']
-                            finish_pos = race_row['Position']
-                            
-                            if pd.isna(grid_pos) or pd.isna(finish_pos):
-                                continue
-                            
-                            race_data = {
-                                'year': year,
-                                'round': round_num,
-                                'event_name': event_name,
-                                'driver': str(driver_abbr),
-                                'driver_number': int(race_row['DriverNumber']) if pd.notna(race_row['DriverNumber']) else 0,
-                                'team': str(race_row['TeamName']),
-                                'grid_position': int(grid_pos),
-                                'finish_position': int(finish_pos),
-                                'points': float(race_row['Points']) if pd.notna(race_row['Points']) else 0.0,
-                                'status': str(race_row['Status']) if pd.notna(race_row['Status']) else 'Unknown',
-                                'q1_time': quali_row['Q1'].total_seconds() if pd.notna(quali_row['Q1']) else None,
-                                'q2_time': quali_row['Q2'].total_seconds() if pd.notna(quali_row['Q2']) else None,
-                                'q3_time': quali_row['Q3'].total_seconds() if pd.notna(quali_row['Q3']) else None,
-                            }
-                            
-                            all_race_data.append(race_data)
-                    
-                    except Exception as e:
-                        print(f"    Error processing {event_name}: {e}")
-                        continue
-            
+                schedule = self.session_provider.get_event_schedule(year)
             except Exception as e:
                 print(f"Error processing {year} season: {e}")
                 continue
+            
+            for idx, event in schedule.iterrows():
+                # Sprint weekends still have a regular qualifying and Grand
+                # Prix, loaded the same way; only testing has neither.
+                if event['EventFormat'] == 'testing':
+                    continue
+                if pd.notna(event['EventDate']) and event['EventDate'] > now:
+                    continue
+                event_date = event['EventDate'].strftime('%Y-%m-%d') if pd.notna(event['EventDate']) else None
+                events.append((year, int(event['RoundNumber']), event['EventName'], event_date))
         
-        df = pd.DataFrame(all_race_data)
+        return events
+    
+    def _collect_events(self, events, max_workers):
+        # Quali/race session loads run on a bounded pool, at most max_workers
+        # events ahead of the one being assembled. Rows are built in schedule
+        # order and each event's sessions are released once its rows exist, so
+        # memory stays flat over a multi-season backfill.
+        max_workers = max(1, max_workers)
+        events = iter(events)
+        pending = deque()
+        frames = []
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            def submit_next():
+                event = next(events, None)
+                if event is not None:
+                    pending.append((
+                        event,
+                        pool.submit(self._load_session, event, 'Q', **RESULTS_ONLY),
+                        pool.submit(self._load_session, event, 'R', **RESULTS_ONLY)
+                    ))
+            
+            for _ in range(max_workers):
+                submit_next()
+            while pending:
+                (year, round_num, event_name, _), quali_future, race_future = pending.popleft()
+                submit_next()
+                try:
+                    quali_results = quali_future.result().results
+                    race_results = race_future.result().results
+                    frames.append(
+                        self._event_rows(year, round_num, event_name, quali_results, race_results)
+                    )
+                except Exception as e:
+                    print(f"    Error processing {event_name}: {e}")
+                del quali_future, race_future
+        
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    
+    def _load_session(self, event, session_type, **load_args):
+        year, round_num, event_name, _ = event
+        for attempt in range(self.max_retries + 1):
+            try:
+                if session_type == 'Q':
+                    print(f"  Fetching {event_name} (Round {round_num})...")
+                session = self.session_provider.get_session(year, round_num, session_type)
+                session.load(**load_args)
+                return session
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.retry_backoff * (2 ** attempt)
+                print(f"    Retrying {event_name} {session_type} in {delay:.1f}s after error: {e}")
+                time.sleep(delay)
+    
+    @staticmethod
+    def _event_rows(year, round_num, event_name, quali_results, race_results):
+        # One keyed merge per session: each finisher is paired with their
+        # first qualifying row, in race-results order. Drivers without a
+        # qualifying row or without grid/finish positions are left out.
+        quali = quali_results[['Abbreviation', 'Q1', 'Q2', 'Q3']].drop_duplicates('Abbreviation')
+        race = race_results.loc[
+            race_results['GridPosition'].notna() & race_results['Position'].notna(),
+            ['Abbreviation', 'DriverNumber', 'TeamName', 'GridPosition', 'Position', 'Points', 'Status']
+        ]
+        merged = race.merge(quali, on='Abbreviation', how='inner', sort=False)
         
-        with open(cache_file, 'wb') as f:
-            pickle.dump(df, f)
+        def seconds(column):
+            return pd.to_timedelta(merged[column]).dt.total_seconds().astype('float32')
         
-        print(f"Collected {len(df)} race entries. Saved to {cache_file}")
-        return df
+        rows = pd.DataFrame({
+            'year': year,
+            'round': round_num,
+            'event_name': event_name,
+            'driver': merged['Abbreviation'].astype(str),
+            'driver_number': pd.to_numeric(merged['DriverNumber'], errors='coerce').fillna(0).astype('int16'),
+            'team': merged['TeamName'].astype(str),
+            'grid_position': merged['GridPosition'].astype('int8'),
+            'finish_position': merged['Position'].astype('int8'),
+            'points': merged['Points'].fillna(0.0).astype('float32'),
+            'status': merged['Status'].fillna('Unknown').astype(str),
+            'q1_time': seconds('Q1'),
+            'q2_time': seconds('Q2'),
+            'q3_time': seconds('Q3'),
+        }, index=merged.index)
+        # Category columns are applied when the round is written to the store.
+        return rows
     
+    @staticmethod
+    def _recent_window(df, key, column, default, how):
+        # For each row, in (year, round) order within its `key` group: the first
+        # row gets `default`, the next two use every row so far (current race
+        # included), later rows use the three rows before the current one.
+        # Shifted columns are added oldest-first, matching the summation order of
+        # the original per-row .iloc slices.
+        values = df[column].astype('float64')
+        grouped = values.groupby(df[key], sort=False, observed=True)
+        position = grouped.cumcount().to_numpy()
+        
+        running = grouped.cumsum().to_numpy()
+        previous = (grouped.shift(3) + grouped.shift(2) + grouped.shift(1)).to_numpy()
+        
+        if how == 'mean':
+            running = running / (position + 1)
+            previous = previous / 3
+        
+        return np.where(position == 0, default, np.where(position < 3, running, previous))
+
     def engineer_features(self, df):
         df = df.copy()
         
-        df = df.sort_values(['year', 'round', 'grid_position'])
+        df = df.sort_values(['year', 'round', 'grid_position']).reset_index(drop=True)
         
-        driver_stats = []
-        for driver in df['driver'].unique():
-            driver_df = df[df['driver'] == driver].sort_values(['year', 'round'])
-            
-            for idx in range(len(driver_df)):
-                if idx < 3:
-                    avg_finish = driver_df.iloc[:idx+1]['finish_position'].mean() if idx > 0 else 10.0
-                    recent_points = driver_df.iloc[:idx+1]['points'].sum() if idx > 0 else 0.0
-                else:
-                    avg_finish = driver_df.iloc[idx-3:idx]['finish_position'].mean()
-                    recent_points = driver_df.iloc[idx-3:idx]['points'].sum()
-                
-                driver_stats.append({
-                    'year': driver_df.iloc[idx]['year'],
-                    'round': driver_df.iloc[idx]['round'],
-                    'driver': driver,
-                    'avg_recent_finish': avg_finish,
-                    'recent_points': recent_points
-                })
-        
-        stats_df = pd.DataFrame(driver_stats)
-        df = df.merge(stats_df, on=['year', 'round', 'driver'], how='left')
-        
-        team_stats = []
-        for team in df['team'].unique():
-            team_df = df[df['team'] == team].sort_values(['year', 'round'])
-            
-            for idx in range(len(team_df)):
-                if idx < 3:
-                    avg_finish = team_df.iloc[:idx+1]['finish_position'].mean() if idx > 0 else 10.0
-                else:
-                    avg_finish = team_df.iloc[idx-3:idx]['finish_position'].mean()
-                
-                team_stats.append({
-                    'year': team_df.iloc[idx]['year'],
-                    'round': team_df.iloc[idx]['round'],
-                    'team': team,
-                    'team_avg_finish': avg_finish
-                })
-        
-        team_stats_df = pd.DataFrame(team_stats)
+        df['avg_recent_finish'] = self._recent_window(df, 'driver', 'finish_position', 10.0, 'mean')
+        df['recent_points'] = self._recent_window(df, 'driver', 'points', 0.0, 'sum')
+        
+        # Team windows are joined back on (year, round, team) as before, so each
+        # row is paired with the windows computed at both teammates' rows.
+        team_stats_df = df[['year', 'round', 'team']].copy()
+        team_stats_df['team_avg_finish'] = self._recent_window(df, 'team', 'finish_position', 10.0, 'mean')
         df = df.merge(team_stats_df, on=['year', 'round', 'team'], how='left')
         
-        df['finished'] = df['status'].apply(lambda x: 1 if 'Finished' in str(x) or '+' in str(x) else 0)
+        status = df['status'].astype(str)
+        df['finished'] = (
+            status.str.contains('Finished', regex=False) | status.str.contains('+', regex=False)
+        ).astype('int64')
         
         df['grid_to_finish_delta'] = df['finish_position'] - df['grid_position']
         
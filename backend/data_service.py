@@ -1,79 +1,170 @@
-import fastf1
+import asyncio
 import pandas as pd
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import os
+try:
+    from .cache import TTLCache
+except ImportError:
+    from cache import TTLCache
 
 
+def _fastf1():
+    # fastf1 (and the scipy stack under it) loads on the first schedule or
+    # session request, not at startup; a process that only serves
+    # predictions never imports it.
+    import fastf1
+    return fastf1
 
 
-def get_next_race():
-    current_year = 2025
+CURRENT_YEAR = 2025
+SCHEDULE_TTL = 6 * 3600
+# Classifications can still change for a while after a race (penalties, late
+# publication), so recently finished rounds are re-checked more often.
+RESULTS_SETTLE_SECONDS = 2 * 24 * 3600
+RACE_DAY = pd.Timedelta(days=1)
+RESULTS_RECHECK_TTL = 15 * 60
+SETTLED_RESULTS_TTL = 7 * 24 * 3600
+
+_schedule_cache = TTLCache('schedule', maxsize=16)
+_next_race_cache = TTLCache('next_race', maxsize=4)
+_standings_cache = TTLCache('standings', maxsize=4)
+# A few seasons of rounds.
+_round_results_cache = TTLCache('round_results', maxsize=128)
+
+# Blocking fastf1 loads for the async endpoints run here, not on the server's
+# shared threadpool, so a slow cold load can't starve other handlers.
+IO_WORKERS = 4
+IO_TIMEOUT_SECONDS = 10.0
+_io_executor = None
+_refreshes = {}
+_refresh_lock = threading.Lock()
+
+
+def _seconds_until(event_date, now):
+    if pd.isna(event_date):
+        return SCHEDULE_TTL
+    return max(0.0, (event_date - now).total_seconds())
+
+
+def get_event_schedule(year):
+    return _schedule_cache.get_or_load(
+        year, lambda: (_fastf1().get_event_schedule(year), SCHEDULE_TTL)
+    )
+
+
+def cache_stats():
+    return [
+        cache.stats()
+        for cache in (_schedule_cache, _next_race_cache, _standings_cache, _round_results_cache)
+    ]
+
+
+def _race_finished_at(schedule):
+    # EventDate is the race day at midnight; a round counts as completed only
+    # once that day is over, so race-day requests don't expect results yet.
+    return schedule['EventDate'] + RACE_DAY
+
+
+def results_ttl(schedule, last_event_date, now):
+    # Valid until the next race completes; re-checked sooner while the last
+    # race's classification may still be settling.
+    finished_at = _race_finished_at(schedule)
+    upcoming = finished_at[finished_at > now]
+    ttl = _seconds_until(upcoming.iloc[0], now) if not upcoming.empty else SCHEDULE_TTL
+    if (now - last_event_date).total_seconds() < RESULTS_SETTLE_SECONDS:
+        ttl = min(ttl, RESULTS_RECHECK_TTL)
+    return ttl
+
+
+def completed_rounds(schedule, now):
+    # Race weekends whose race day is over; testing events have round 0.
+    return schedule[(_race_finished_at(schedule) <= now) & (schedule['RoundNumber'] > 0)]
+
+
+def remaining_rounds(schedule, now):
+    return schedule[(_race_finished_at(schedule) > now) & (schedule['RoundNumber'] > 0)]
+
+
+def _load_next_race(current_year):
     now = datetime.now()
-    try:
-        schedule = fastf1.get_event_schedule(current_year)
+    schedule = get_event_schedule(current_year)
 
-        remaining = schedule[schedule['EventDate'] >= now]
-        if remaining.empty:
-            return None
-        next_race = remaining.iloc[0]
-        return {
-            "round": int(next_race['RoundNumber']),
-            "race_name": next_race['EventName'],
-            "date": next_race['EventDate'].strftime('%Y-%m-%d'),
-            "time": next_race['Session1Date'].strftime('%H:%M:%S') if pd.notna(next_race['Session1Date']) else "00:00:00",
-            "circuit_name": next_race['Location'],
-            "location": next_race['Country']
-        }
+    remaining = schedule[schedule['EventDate'] >= now]
+    if remaining.empty:
+        return None, SCHEDULE_TTL
+    next_race = remaining.iloc[0]
+    race = {
+        "round": int(next_race['RoundNumber']),
+        "race_name": next_race['EventName'],
+        "date": next_race['EventDate'].strftime('%Y-%m-%d'),
+        "time": next_race['Session1Date'].strftime('%H:%M:%S') if pd.notna(next_race['Session1Date']) else "00:00:00",
+        "circuit_name": next_race['Location'],
+        "location": next_race['Country']
+    }
+    # The answer only changes once this race's date has passed.
+    return race, min(SCHEDULE_TTL, _seconds_until(next_race['EventDate'], now))
+
+
+def get_next_race():
+    current_year = CURRENT_YEAR
+    try:
+        return _next_race_cache.get_or_load(current_year, lambda: _load_next_race(current_year))
     except Exception as e:
         print(f"Error fetching next race: {e}")
         return None
 
-def get_driver_standings():
+def _load_driver_standings(current_year):
+    now = datetime.now()
+    schedule = get_event_schedule(current_year)
+    completed = schedule[schedule['EventDate'] < now]
+    
+    if completed.empty:
+        return [], SCHEDULE_TTL
 
+    last_event = completed.iloc[-1]
+    session = _fastf1().get_session(current_year, last_event['RoundNumber'], 'R')
+    session.load()
+    results = session.results
+    
+    standings = []
+    for i, row in results.iterrows():
+        standings.append({
+            "position": int(row['Position']) if pd.notna(row['Position']) else 0,
+            "points": float(row['Points']),
+            "wins": 0,
+            "driver": {
+                "driver_id": str(row['DriverId']),
+                "code": str(row['Abbreviation']),
+                "url": "",
+                "given_name": row['BroadcastName'].split(" ")[0] if " " in row['BroadcastName'] else row['BroadcastName'],
+                "family_name": row['BroadcastName'].split(" ")[-1] if " " in row['BroadcastName'] else "",
+                "date_of_birth": "",
+                "nationality": "",
+                "permanent_number": str(row['DriverNumber'])
+            },
+            "constructors": [{
+                "constructor_id": str(row['TeamId']),
+                "url": "",
+                "name": str(row['TeamName']),
+                "nationality": ""
+            }]
+        })
+    
+    ttl = results_ttl(schedule, last_event['EventDate'], now)
+    
+    return {
+        "race_name": last_event['EventName'],
+        "round": int(last_event['RoundNumber']),
+        "season": current_year,
+        "standings": standings
+    }, ttl
 
-    current_year = 2025
-    now = datetime.now()
+def get_driver_standings():
+    current_year = CURRENT_YEAR
     try:
-        schedule = fastf1.get_event_schedule(current_year)
-        completed = schedule[schedule['EventDate'] < now]
-        
-        if completed.empty:
-            return []
-
-        last_event = completed.iloc[-1]
-        session = fastf1.get_session(current_year, last_event['RoundNumber'], 'R')
-        session.load()
-        results = session.results
-        
-        standings = []
-        for i, row in results.iterrows():
-            standings.append({
-                "position": int(row['Position']) if pd.notna(row['Position']) else 0,
-                "points": float(row['Points']),
-                "wins": 0,
-                "driver": {
-                    "driver_id": str(row['DriverId']),
-                    "code": str(row['Abbreviation']),
-                    "url": "",
-                    "given_name": row['BroadcastName'].split(" ")[0] if " " in row['BroadcastName'] else row['BroadcastName'],
-                    "family_name": row['BroadcastName'].split(" ")[-1] if " " in row['BroadcastName'] else "",
-                    "date_of_birth": "",
-                    "nationality": "",
-                    "permanent_number": str(row['DriverNumber'])
-                },
-                "constructors": [{
-                    "constructor_id": str(row['TeamId']),
-                    "url": "",
-                    "name": str(row['TeamName']),
-                    "nationality": ""
-                }]
-            })
-        return {
-            "race_name": last_event['EventName'],
-            "round": int(last_event['RoundNumber']),
-            "season": current_year,
-            "standings": standings
-        }
+        return _standings_cache.get_or_load(current_year, lambda: _load_driver_standings(current_year))
     except Exception as e:
         print(f"Error fetching standings: {e}")
         return {
@@ -83,9 +174,80 @@ def get_driver_standings():
             "standings": []
         }
 
+def _load_round_results(year, round_num, event_date):
+    session = _fastf1().get_session(year, round_num, 'R')
+    # Only the classification is read; skip the lap, telemetry, weather and
+    # race-control downloads.
+    session.load(laps=False, telemetry=False, weather=False, messages=False)
+    results = session.results
+    
+    frame = pd.DataFrame({
+        'driver': results['Abbreviation'].astype(str).to_numpy(),
+        'team': results['TeamName'].astype(str).to_numpy(),
+        'grid_position': pd.to_numeric(results['GridPosition'], errors='coerce').fillna(0).astype(int).to_numpy(),
+        'finish_position': pd.to_numeric(results['Position'], errors='coerce').fillna(0).astype(int).to_numpy(),
+        'points': pd.to_numeric(results['Points'], errors='coerce').fillna(0.0).to_numpy(),
+    })
+    
+    settled = (datetime.now() - event_date).total_seconds() >= RESULTS_SETTLE_SECONDS
+    return frame, SETTLED_RESULTS_TTL if settled else RESULTS_RECHECK_TTL
+
+def get_round_results(year, round_num, event_date):
+    # Race classification of one completed round, cached per round so a new
+    # race only costs one extra session load.
+    return _round_results_cache.get_or_load(
+        (year, int(round_num)), lambda: _load_round_results(year, int(round_num), event_date)
+    )
+
+def _get_io_executor():
+    # Created on first use and dropped by shutdown(), so a later lifespan in
+    # the same process (test client re-entry, reload) gets a fresh pool.
+    # Called with _refresh_lock held.
+    global _io_executor
+    if _io_executor is None:
+        _io_executor = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix='f1-io')
+    return _io_executor
+
+def _submit_refresh(name, load):
+    # At most one queued or running load per endpoint.
+    with _refresh_lock:
+        future = _refreshes.get(name)
+        if future is None or future.done():
+            future = _get_io_executor().submit(load)
+            _refreshes[name] = future
+        return future
+
+async def serve_cached(name, cache, key, load, timeout=IO_TIMEOUT_SECONDS):
+    cached = cache.lookup(key)
+    if cached is not None:
+        value, fresh, _ = cached
+        if not fresh:
+            # Stale-while-revalidate: answer now, refresh in the background.
+            _submit_refresh(name, load)
+        return value
+    
+    future = _submit_refresh(name, load)
+    # shield() keeps a timed-out request from cancelling the shared load; it
+    # still completes and fills the cache for the next caller.
+    return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+
+async def get_next_race_async(timeout=IO_TIMEOUT_SECONDS):
+    return await serve_cached('next_race', _next_race_cache, CURRENT_YEAR, get_next_race, timeout)
+
+async def get_driver_standings_async(timeout=IO_TIMEOUT_SECONDS):
+    return await serve_cached('standings', _standings_cache, CURRENT_YEAR, get_driver_standings, timeout)
+
+def shutdown():
+    global _io_executor
+    with _refresh_lock:
+        executor, _io_executor = _io_executor, None
+        _refreshes.clear()
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
 def get_race_data(year, round_num):
     try:
-        session = fastf1.get_session(year, round_num, 'R')
+        session = _fastf1().get_session(year, round_num, 'R')
         session.load()
         return session
     except Exception as e:
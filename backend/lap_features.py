@@ -0,0 +1,80 @@
+import pandas as pd
+
+# Per-driver race summaries built from a session's laps. Each round's raw laps
+# are reduced to one row per driver as soon as the session is loaded, so only
+# these summaries are ever kept for a season.
+LAP_FEATURE_COLUMNS = [
+    'laps_completed', 'clean_laps', 'pit_stops', 'race_pace', 'pace_delta', 'pace_std', 'degradation'
+]
+
+# Laps slower than this share of the driver's median clean lap are dropped
+# (traffic, incidents, slow laps the flags didn't catch).
+OUTLIER_RATIO = 1.07
+
+# A stint needs this many clean laps before its degradation slope counts.
+MIN_STINT_LAPS = 5
+
+LAP_COLUMNS = ['Driver', 'LapNumber', 'LapTime', 'Stint', 'TyreLife', 'PitInTime', 'PitOutTime',
+               'TrackStatus', 'IsAccurate']
+
+
+def _clean_laps(laps, lap_seconds):
+    clean = lap_seconds.notna() & (laps['LapNumber'] > 1)
+    clean &= laps['PitInTime'].isna() & laps['PitOutTime'].isna()
+    if 'TrackStatus' in laps:
+        # '1' is green; anything else (yellow, SC, VSC, red) distorts lap time.
+        clean &= laps['TrackStatus'].astype(str).eq('1')
+    if 'IsAccurate' in laps:
+        clean &= laps['IsAccurate'].fillna(False).astype(bool)
+
+    median = lap_seconds.where(clean).groupby(laps['Driver']).transform('median')
+    return clean & (lap_seconds <= median * OUTLIER_RATIO)
+
+
+def _stint_degradation(driver, stint, tyre_life, lap_seconds):
+    # Least-squares slope of lap time on tyre age per stint (seconds per lap
+    # of tyre life), averaged per driver weighted by the stint's clean laps.
+    frame = pd.DataFrame({
+        'driver': driver, 'stint': stint,
+        'x': tyre_life, 'y': lap_seconds,
+        'xx': tyre_life * tyre_life, 'xy': tyre_life * lap_seconds
+    }).dropna()
+    sums = frame.groupby(['driver', 'stint'], observed=True).agg(
+        n=('x', 'size'), x=('x', 'sum'), y=('y', 'sum'), xx=('xx', 'sum'), xy=('xy', 'sum')
+    )
+    sums = sums[sums['n'] >= MIN_STINT_LAPS]
+    spread = sums['n'] * sums['xx'] - sums['x'] ** 2
+    sums = sums[spread > 0]
+    slope = (sums['n'] * sums['xy'] - sums['x'] * sums['y']) / spread[spread > 0]
+    weighted = (slope * sums['n']).groupby(level='driver').sum()
+    return weighted / sums['n'].groupby(level='driver').sum()
+
+
+def summarize_laps(laps):
+    if laps is None or len(laps) == 0:
+        return pd.DataFrame(columns=['driver'] + LAP_FEATURE_COLUMNS)
+
+    laps = laps[[col for col in LAP_COLUMNS if col in laps.columns]]
+    lap_seconds = laps['LapTime'].dt.total_seconds()
+    clean = _clean_laps(laps, lap_seconds)
+    driver = laps['Driver'].astype(str)
+    clean_seconds = lap_seconds.where(clean)
+
+    by_driver = clean_seconds.groupby(driver)
+    summary = pd.DataFrame({
+        'laps_completed': laps['LapNumber'].groupby(driver).max(),
+        'clean_laps': clean.groupby(driver).sum(),
+        'pit_stops': (laps['Stint'].groupby(driver).nunique() - 1).clip(lower=0),
+        'race_pace': by_driver.median(),
+        'pace_std': by_driver.std(),
+    })
+    summary['pace_delta'] = summary['race_pace'] - summary['race_pace'].min()
+    summary['degradation'] = _stint_degradation(
+        driver[clean], laps['Stint'][clean], laps['TyreLife'][clean].astype('float64'), lap_seconds[clean]
+    )
+
+    summary = summary.rename_axis('driver').reset_index()
+    return summary[['driver'] + LAP_FEATURE_COLUMNS].astype({
+        'laps_completed': 'int16', 'clean_laps': 'int16', 'pit_stops': 'int8',
+        'race_pace': 'float32', 'pace_delta': 'float32', 'pace_std': 'float32', 'degradation': 'float32'
+    })
@@ -1,9 +1,25 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from . import data_service, schemas, model
+from fastapi.responses import JSONResponse, PlainTextResponse
+from . import championship, data_service, metrics, schemas, model, simulation, training_jobs
 import uvicorn
 
-app = FastAPI(title="F1 Predictor API")
+
+@asynccontextmanager
+async def lifespan(app):
+    # Pay artifact deserialization and first-call warm-up before serving traffic.
+    await run_in_threadpool(model.get_predictor().load)
+    yield
+    training_jobs.jobs.shutdown()
+    data_service.shutdown()
+
+
+app = FastAPI(title="F1 Predictor API", lifespan=lifespan)
+
+MAX_SIMULATIONS = 100000
 
 app.add_middleware(
     CORSMiddleware,
@@ -12,25 +28,89 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(metrics.MetricsMiddleware)
+
+
+# /cache-stats fields that only ever increase; everything else is a gauge.
+CACHE_COUNTER_FIELDS = {'hits', 'misses', 'coalesced', 'evictions', 'loads', 'load_errors', 'load_seconds'}
+
+
+def _cache_metrics():
+    # Every numeric field of the /cache-stats entries, one metric per field.
+    stats = data_service.cache_stats() + championship.cache_stats() + [model.prediction_cache_stats()]
+    fields = {}
+    for cache in stats:
+        for field, value in cache.items():
+            if field != 'name' and isinstance(value, (int, float)):
+                fields.setdefault(field, []).append(({'cache': cache['name']}, value))
+    return [
+        (f'f1_cache_{field}_total', 'counter', f'Cache {field.replace("_", " ")}.', samples)
+        if field in CACHE_COUNTER_FIELDS else
+        (f'f1_cache_{field}', 'gauge', f'Cache {field.replace("_", " ")}.', samples)
+        for field, samples in fields.items()
+    ]
+
+
+metrics.register_collector(_cache_metrics)
 
 @app.get("/")
 def read_root():
     return {"message": "F1 Predictor API is running"}
 
+@app.get("/ready")
+def readiness():
+    # Not ready until load() has also finished warm-up, so traffic never
+    # lands on a model that is still loaded but cold.
+    predictor = model.get_predictor()
+    status = {
+        "ready": predictor.ready,
+        "load_seconds": predictor.load_seconds,
+        "warmup_seconds": predictor.warmup_seconds
+    }
+    return JSONResponse(status, status_code=200 if predictor.ready else 503)
+
 @app.get("/next-race", response_model=schemas.RaceSchedule)
-def get_next_race():
-    race = data_service.get_next_race()
+async def get_next_race():
+    try:
+        race = await data_service.get_next_race_async()
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Timed out loading the race schedule")
     if not race:
         raise HTTPException(status_code=404, detail="No upcoming races found")
     return race
 
 @app.get("/standings", response_model=schemas.StandingsResponse)
-def get_standings():
-    return data_service.get_driver_standings()
+async def get_standings():
+    try:
+        return await data_service.get_driver_standings_async()
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Timed out loading standings")
+
+@app.get("/championship/projection", response_model=schemas.ChampionshipProjection)
+async def get_championship_projection(n_simulations: int = championship.PROJECTION_SIMULATIONS):
+    if not 1 <= n_simulations <= MAX_SIMULATIONS:
+        raise HTTPException(status_code=400, detail=f"n_simulations must be between 1 and {MAX_SIMULATIONS}")
+    try:
+        return await championship.get_projection_async(model.get_predictor(), n_sims=n_simulations)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Timed out loading season results")
+    except Exception as e:
+        print(f"Error projecting championship: {e}")
+        raise HTTPException(status_code=503, detail="Championship projection unavailable")
+
+@app.get("/cache-stats")
+def get_cache_stats():
+    return {
+        "caches": data_service.cache_stats() + championship.cache_stats() + [model.prediction_cache_stats()]
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 @app.post("/predict", response_model=schemas.PredictionOutput)
 def predict_race(input: schemas.PredictionInput):
-    prediction = model.predictor.predict(
+    prediction = model.get_predictor().predict(
         input.driver_id, 
         input.constructor_id, 
         input.grid_position
@@ -44,18 +124,74 @@ def predict_race(input: schemas.PredictionInput):
         "confidence": prediction.get('confidence', 0.5)
     }
 
-@app.post("/train-model")
-def train_model_endpoint():
-    try:
-        from . import model as model_module
-        result = model_module.train_model_from_data()
-        return {
-            "status": "success",
-            "message": "Model trained successfully",
-            "metrics": result
+@app.post("/predict/grid", response_model=schemas.GridPredictionOutput)
+def predict_grid(input: schemas.GridPredictionInput):
+    predictions = model.get_predictor().predict_grid([
+        {
+            'driver': entry.driver_id,
+            'team': entry.constructor_id,
+            'grid': entry.grid_position
         }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Training failed: {str(e)}")
+        for entry in input.entries
+    ])
+    
+    return {
+        "predictions": [
+            {
+                "driver_id": entry.driver_id,
+                "predicted_position": prediction['predicted_position'],
+                "win_probability": prediction['win_probability'],
+                "podium_probability": prediction['podium_probability'],
+                "confidence": prediction['confidence'],
+                "field_win_probability": prediction['field_win_probability'],
+                "field_podium_probability": prediction['field_podium_probability']
+            }
+            for entry, prediction in zip(input.entries, predictions)
+        ]
+    }
+
+@app.post("/simulate/race", response_model=schemas.RaceSimulationOutput)
+def simulate_race(input: schemas.RaceSimulationInput):
+    if not 1 <= input.n_simulations <= MAX_SIMULATIONS:
+        raise HTTPException(status_code=400, detail=f"n_simulations must be between 1 and {MAX_SIMULATIONS}")
+    
+    results = simulation.simulate_race(
+        model.get_predictor(),
+        [
+            {
+                'driver': entry.driver_id,
+                'team': entry.constructor_id,
+                'grid': entry.grid_position,
+                'current_points': entry.current_points
+            }
+            for entry in input.entries
+        ],
+        n_sims=input.n_simulations,
+        seed=input.seed
+    )
+    
+    return {
+        "n_simulations": input.n_simulations,
+        "drivers": [
+            {"driver_id": entry.driver_id, **result}
+            for entry, result in zip(input.entries, results)
+        ]
+    }
+
+@app.post("/train-model", response_model=schemas.TrainingJobStatus, status_code=202)
+def train_model_endpoint(incremental: bool = False):
+    # Training runs in a separate low-priority process; the new model is swapped
+    # in atomically once it has been saved, loaded and warmed up. incremental
+    # updates the current model with rounds it hasn't seen instead of
+    # retraining from scratch.
+    return training_jobs.jobs.submit(incremental=incremental)
+
+@app.get("/train-model/{job_id}", response_model=schemas.TrainingJobStatus)
+def training_job_status(job_id: str):
+    job = training_jobs.jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Unknown training job")
+    return job
 
 
 if __name__ == "__main__":
@@ -0,0 +1,182 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# Minimal in-process Prometheus metrics, rendered in the text exposition
+# format by /metrics. Recording is a lock plus a few list updates, cheap enough
+# for the predict hot path; gauges that mirror existing state (cache stats,
+# model load times) are produced by collectors at scrape time instead.
+# Each worker process keeps its own values. F1_METRICS=0 turns recording off.
+ENABLED = os.environ.get('F1_METRICS', '1') != '0'
+
+HTTP_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STAGE_BUCKETS = (2e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 1e-2)
+
+_registry = []
+_collectors = []
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+        _registry.append(self)
+
+    def _header(self):
+        return [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, *labels, amount=1):
+        if not ENABLED:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        return self._header() + [
+            f'{self.name}{_labels(self.label_names, labels)} {_number(value)}' for labels, value in values
+        ]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=HTTP_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        if not ENABLED:
+            return
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                # per-bucket counts (last one is +Inf), then the sum
+                series = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self):
+        with self._lock:
+            values = sorted((labels, list(series)) for labels, series in self._values.items())
+        lines = self._header()
+        for labels, series in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series):
+                cumulative += count
+                lines.append(
+                    f'{self.name}_bucket{_labels(self.label_names, labels, ("le", _number(bound)))} {cumulative}'
+                )
+            lines.append(f'{self.name}_sum{_labels(self.label_names, labels)} {_number(series[-1])}')
+            lines.append(f'{self.name}_count{_labels(self.label_names, labels)} {cumulative}')
+        return lines
+
+
+def register_collector(collect):
+    # collect() -> [(name, kind, help, [(labels_dict, value), ...]), ...]
+    _collectors.append(collect)
+
+
+def render():
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    for collect in _collectors:
+        try:
+            families = collect()
+        except Exception as e:
+            print(f"Metrics collector failed: {e}")
+            continue
+        for name, kind, help, samples in families:
+            lines.extend([f'# HELP {name} {help}', f'# TYPE {name} {kind}'])
+            for labels, value in samples:
+                if value is None:
+                    continue
+                lines.append(f'{name}{_labels(tuple(labels), tuple(labels.values()))} {_number(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+REQUEST_SECONDS = Histogram(
+    'f1_http_request_duration_seconds', 'HTTP request latency by route.',
+    labels=('method', 'route', 'status')
+)
+PREDICT_STAGE_SECONDS = Histogram(
+    'f1_predict_stage_seconds', 'Time spent in each prediction stage (batch stages cover the whole batch).',
+    labels=('mode', 'stage'), buckets=STAGE_BUCKETS
+)
+PREDICTION_FALLBACKS = Counter(
+    'f1_prediction_fallbacks_total', 'Predictions answered by a heuristic instead of the model.',
+    labels=('reason',)
+)
+UNKNOWN_ENTITIES = Counter(
+    'f1_prediction_unknown_total', 'Prediction requests naming a driver or team the model has not seen.',
+    labels=('kind',)
+)
+
+PREDICT_STAGES = ('feature_build', 'position_model', 'win_model', 'podium_heuristic', 'confidence')
+
+
+def record_predict_stages(mode, marks):
+    # marks: perf_counter() readings at the start and after each PREDICT_STAGES stage
+    if not ENABLED:
+        return
+    for stage, start, end in zip(PREDICT_STAGES, marks, marks[1:]):
+        PREDICT_STAGE_SECONDS.observe(end - start, mode, stage)
+
+
+# Pure ASGI middleware (no per-request task or body buffering) timing every
+# HTTP request, labelled by the matched route template rather than the raw path.
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_with_status(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get('route')
+            REQUEST_SECONDS.observe(
+                time.perf_counter() - start, scope['method'],
+                getattr(route, 'path', 'unmatched'), str(status[0])
+            )
@@ -1,213 +1,870 @@
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
-from sklearn.metrics import mean_absolute_error, mean_squared_error
-import joblib
+import itertools
 import os
+import threading
+import time
+import uuid
+from datetime import datetime
+from functools import cached_property
 try:
-    from .data_collector import F1DataCollector
+    from .artifacts import FittedLabels, is_artifact, load_artifact, save_artifact
+    from .cache import LRUCache
+    from . import metrics
+    from .stats_index import StatsIndex, build_stats
+    from .tree_engine import CompiledForest
 except ImportError:
-    from data_collector import F1DataCollector
+    from artifacts import FittedLabels, is_artifact, load_artifact, save_artifact
+    from cache import LRUCache
+    import metrics
+    from stats_index import StatsIndex, build_stats
+    from tree_engine import CompiledForest
+
+# sklearn, joblib and the data collector (fastf1) are imported inside the
+# training and legacy-loading paths: serving from an artifact needs only
+# numpy and pandas, which keeps worker start-up and reloads fast.
+
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+ARTIFACT_DIR = os.path.join(MODEL_DIR, 'models')
+CURRENT_POINTER = os.path.join(ARTIFACT_DIR, 'CURRENT')
+LEGACY_MODEL_PATH = os.path.join(MODEL_DIR, 'race_predictor_v2.joblib')
+
+# Per-thread single-row feature buffers for the fast predict path. Trees
+# evaluate in float32, which is what sklearn casts inputs to anyway.
+_row_buffers = threading.local()
+
+# Serializes artifact loading so concurrent first requests can't race on is_trained.
+_load_lock = threading.Lock()
+
+# /predict inputs repeat a lot (drivers x grid slots x teams). Keys are scoped
+# to the model's full path and the load that built it, so a retrained model,
+# or a same-named artifact in another directory, never sees stale entries.
+PREDICTION_CACHE_SIZE = int(os.environ.get('F1_PREDICTION_CACHE_SIZE', 8192))
+WARM_PREDICTION_CACHE = os.environ.get('F1_WARM_PREDICTION_CACHE', '0') == '1'
+_prediction_cache = LRUCache('predictions', PREDICTION_CACHE_SIZE)
+_cache_generations = itertools.count()
+
+# How often serving processes re-read the CURRENT pointer.
+POINTER_CHECK_SECONDS = 5.0
+_pointer_lock = threading.Lock()
+_pointer_checked_at = 0.0
+# Path of a published model being loaded in the background, if any.
+_pointer_loading = None
+
+
+POSITION_FOREST_PARAMS = {
+    'n_estimators': 200,
+    'max_depth': 15,
+    'min_samples_split': 5,
+    'min_samples_leaf': 2,
+    'oob_score': True,
+    'random_state': 42,
+    'n_jobs': -1
+}
+WIN_FOREST_PARAMS = {
+    'n_estimators': 150,
+    'max_depth': 10,
+    'random_state': 42,
+    'n_jobs': -1
+}
+
+# Share of each forest regrown per new round in incremental updates.
+INCREMENTAL_TREE_FRACTION = 0.1
+
+# Used when a training frame lacks an engineered feature column.
+FEATURE_DEFAULTS = {
+    'avg_recent_finish': 10.0,
+    'recent_points': 0.0,
+    'team_avg_finish': 10.0
+}
+
+
+def _rounds_in(data):
+    if 'year' not in data.columns or 'round' not in data.columns:
+        return []
+    pairs = data[['year', 'round']].drop_duplicates().astype(int).itertuples(index=False)
+    return sorted((year, round_num) for year, round_num in pairs)
+
+
+def _lap(timings, stage, start):
+    now = time.perf_counter()
+    timings[stage] = now - start
+    return now
+
+
+def _capped_shares(weights, total):
+    # Spreads `total` over the weights proportionally with no share above 1:
+    # capped entries are fixed at 1 and their excess is redistributed over the
+    # rest until nothing overflows (water-filling).
+    weights = np.asarray(weights, dtype=np.float64)
+    shares = np.zeros(len(weights))
+    free = weights > 0
+    remaining = float(total)
+    while free.any() and remaining > 0:
+        shares[free] = weights[free] * remaining / weights[free].sum()
+        over = free & (shares >= 1.0)
+        if not over.any():
+            break
+        shares[over] = 1.0
+        free &= ~over
+        remaining = total - shares[~free].sum()
+    return shares
+
+
+def feature_matrix(data, driver_codes, team_codes):
+    # Built straight from the needed columns, without copying the rest of the frame.
+    X = pd.DataFrame({
+        'driver_enc': driver_codes,
+        'team_enc': team_codes
+    }, index=data.index)
+    
+    for col in ('grid_position', 'avg_recent_finish', 'recent_points', 'team_avg_finish'):
+        X[col] = data[col] if col in data.columns else FEATURE_DEFAULTS[col]
+    
+    return X, data['finish_position']
+
+
+def prepare_features(data):
+    # Fits fresh driver/team encoders; returns (X, y, le_driver, le_team).
+    from sklearn.preprocessing import LabelEncoder
+    le_driver = LabelEncoder()
+    le_team = LabelEncoder()
+    X, y = feature_matrix(data, le_driver.fit_transform(data['driver']), le_team.fit_transform(data['team']))
+    return X, y, le_driver, le_team
+
+
+def _get_row_buffers():
+    buffers = getattr(_row_buffers, 'buffers', None)
+    if buffers is None:
+        buffers = (np.empty((1, 6), dtype=np.float32), np.empty((1, 7), dtype=np.float32))
+        _row_buffers.buffers = buffers
+    return buffers
+
+
+def current_model_path():
+    try:
+        with open(CURRENT_POINTER) as f:
+            name = f.read().strip()
+    except FileNotFoundError:
+        name = ''
+    
+    if name and os.path.exists(os.path.join(ARTIFACT_DIR, name)):
+        return os.path.join(ARTIFACT_DIR, name)
+    return LEGACY_MODEL_PATH
+
+
+def new_model_path():
+    version = f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    return os.path.join(ARTIFACT_DIR, f'race_predictor_{version}')
+
+
+def publish_model(model_path):
+    # Point CURRENT at a fully written artifact; os.replace makes the swap atomic.
+    os.makedirs(ARTIFACT_DIR, exist_ok=True)
+    tmp_pointer = f"{CURRENT_POINTER}.{os.getpid()}.tmp"
+    with open(tmp_pointer, 'w') as f:
+        f.write(os.path.basename(model_path))
+    os.replace(tmp_pointer, CURRENT_POINTER)
 
 
 class RacePredictor:
-    def __init__(self):
-        self.position_model = RandomForestRegressor(
-            n_estimators=200,
-            max_depth=15,
-            min_samples_split=5,
-            min_samples_leaf=2,
-            random_state=42,
-            n_jobs=-1
-        )
-        self.win_prob_model = RandomForestRegressor(
-            n_estimators=150,
-            max_depth=10,
-            random_state=42,
-            n_jobs=-1
-        )
-        
-        self.le_driver = LabelEncoder()
-        self.le_team = LabelEncoder()
+    def __init__(self, model_path=None):
+        self.le_driver = FittedLabels()
+        self.le_team = FittedLabels()
         self.is_trained = False
-        self.model_path = os.path.join(os.path.dirname(__file__), 'race_predictor_v2.joblib')
+        self.model_path = model_path or current_model_path()
         
         self.driver_stats = {}
         self.team_stats = {}
         self.feature_names = []
-
-    def prepare_features(self, data):
-        df = data.copy()
-        
-        required_cols = ['driver', 'team', 'grid_position', 'avg_recent_finish', 
-                        'recent_points', 'team_avg_finish', 'finished']
-        
-        for col in required_cols:
-            if col not in df.columns:
-                if col == 'avg_recent_finish':
-                    df[col] = 10.0
-                elif col == 'recent_points':
-                    df[col] = 0.0
-                elif col == 'team_avg_finish':
-                    df[col] = 10.0
-                elif col == 'finished':
-                    df[col] = 1
         
-        df['driver_enc'] = self.le_driver.fit_transform(df['driver'])
-        df['team_enc'] = self.le_team.fit_transform(df['team'])
+        self.fast_path = True
+        self.use_prediction_cache = True
+        self._driver_codes = {}
+        self._team_codes = {}
+        self._position_trees = None
+        self._win_trees = None
+        self._cache_scope = None
         
-        feature_cols = ['driver_enc', 'team_enc', 'grid_position', 
-                       'avg_recent_finish', 'recent_points', 'team_avg_finish']
+        # 'sklearn' walks the fitted trees; 'compiled' uses tree_engine.CompiledForest.
+        self.inference_backend = os.environ.get('F1_INFERENCE_BACKEND', 'sklearn')
+        self._position_engine = None
+        self._win_engine = None
         
-        self.feature_names = feature_cols
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self.training_timings = None
+        # Set once load() has finished warming up; /ready reports this.
+        self.ready = False
         
-        return df[feature_cols], df['finish_position']
+        # (year, round) pairs the model has been trained on, for incremental updates.
+        self.trained_rounds = None
+        self.parent_version = None
+
+    # Unfitted forests are only built when something reads them before a
+    # trained model is assigned, i.e. when training.
+    @cached_property
+    def position_model(self):
+        from sklearn.ensemble import RandomForestRegressor
+        return RandomForestRegressor(**POSITION_FOREST_PARAMS)
+
+    @cached_property
+    def win_prob_model(self):
+        from sklearn.ensemble import RandomForestRegressor
+        return RandomForestRegressor(**WIN_FOREST_PARAMS)
+
+    def __getstate__(self):
+        # Derived inference structures are rebuilt after loading; keep them out of artifacts.
+        state = self.__dict__.copy()
+        for key in ('_position_trees', '_win_trees', '_position_engine', '_win_engine', '_cache_scope'):
+            state[key] = None
+        state['ready'] = False
+        return state
+
+    @property
+    def version(self):
+        return os.path.splitext(os.path.basename(self.model_path))[0]
+
+    def prepare_features(self, data):
+        X, y, self.le_driver, self.le_team = prepare_features(data)
+        self.feature_names = list(X.columns)
+        return X, y
+
+    def _feature_matrix(self, data, driver_codes, team_codes):
+        X, y = feature_matrix(data, driver_codes, team_codes)
+        self.feature_names = list(X.columns)
+        return X, y
 
     def train(self, data):
+        from sklearn.metrics import mean_absolute_error, mean_squared_error
+        from sklearn.model_selection import train_test_split
         print("Training F1 race prediction model...")
         print(f"Training data shape: {data.shape}")
         
+        timings = {}
+        clock = time.perf_counter()
+        
+        # Encoded once; every later stage reuses this matrix.
         X, y = self.prepare_features(data)
+        clock = _lap(timings, 'encode', clock)
         
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42
+        train_idx, test_idx = train_test_split(
+            np.arange(len(X)), test_size=0.2, random_state=42
         )
+        X_train, y_train = X.iloc[train_idx], y.iloc[train_idx]
+        X_test, y_test = X.iloc[test_idx], y.iloc[test_idx]
         
         print("Training position prediction model...")
         self.position_model.fit(X_train, y_train)
+        clock = _lap(timings, 'position_fit', clock)
         
         y_pred = self.position_model.predict(X_test)
         mae = mean_absolute_error(y_test, y_pred)
-        rmse = np.sqrt(mean_squared_error(y_test, y_pred))
+        rmse = float(np.sqrt(mean_squared_error(y_test, y_pred)))
         
         print(f"Position Model - MAE: {mae:.2f}, RMSE: {rmse:.2f}")
+        clock = _lap(timings, 'evaluate', clock)
         
-
-        data_with_pred = data.copy()
-        X_pred, _ = self.prepare_features(data_with_pred)
-        
-
-        data_with_pred['predicted_position'] = self.position_model.predict(X_pred)
-        data_with_pred['won'] = (data_with_pred['finish_position'] == 1).astype(int)
+        # The win model is stacked on predicted positions. Each row's
+        # prediction comes from trees that never saw it: out-of-bag trees for
+        # training rows, the fitted forest for held-out rows. Predicting the
+        # training rows with the full forest would feed the win model
+        # memorised positions it never gets at serving time.
+        oof_position = np.empty(len(X))
+        oof_position[train_idx] = self._out_of_fold_positions(X_train, y_train)
+        oof_position[test_idx] = y_pred
+        clock = _lap(timings, 'out_of_fold', clock)
         
-
-        X_win = X_pred.copy()
-        X_win['predicted_position'] = data_with_pred['predicted_position'].values
-        y_win = data_with_pred['won']
+        X_win = X.copy()
+        # Rounded and clipped exactly as predict() feeds it.
+        X_win['predicted_position'] = np.clip(np.rint(oof_position), 1, 20)
+        y_win = (y == 1).astype(int)
         
         print("Training win probability model...")
         self.win_prob_model.fit(X_win, y_win)
+        clock = _lap(timings, 'win_fit', clock)
         
-        for driver in data['driver'].unique():
-            driver_data = data[data['driver'] == driver]
-            self.driver_stats[driver] = {
-                'avg_finish': driver_data['finish_position'].mean(),
-                'avg_grid': driver_data['grid_position'].mean(),
-                'wins': (driver_data['finish_position'] == 1).sum(),
-                'podiums': (driver_data['finish_position'] <= 3).sum(),
-                'total_races': len(driver_data),
-                'avg_points': driver_data['points'].mean()
-            }
-        
-        for team in data['team'].unique():
-            team_data = data[data['team'] == team]
-            self.team_stats[team] = {
-                'avg_finish': team_data['finish_position'].mean(),
-                'wins': (team_data['finish_position'] == 1).sum(),
-                'total_races': len(team_data)
-            }
+        self.driver_stats, self.team_stats = build_stats(
+            data, self.le_driver.classes_, X['driver_enc'].to_numpy(),
+            self.le_team.classes_, X['team_enc'].to_numpy()
+        )
+        self.trained_rounds = _rounds_in(data)
+        self.parent_version = None
+        clock = _lap(timings, 'stats', clock)
         
+        self._build_fast_path()
         self.is_trained = True
+        clock = _lap(timings, 'fast_path', clock)
         
+        return self._save(mae, rmse, timings, clock)
+
+    def _save(self, mae, rmse, timings, clock):
         print(f"Saving model to {self.model_path}...")
-        joblib.dump(self, self.model_path)
+        if self.model_path.endswith('.joblib'):
+            import joblib
+            os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
+            tmp_path = f"{self.model_path}.{os.getpid()}.tmp"
+            joblib.dump(self, tmp_path)
+            os.replace(tmp_path, self.model_path)
+        else:
+            save_artifact(self, self.model_path, metrics={'mae': mae, 'rmse': rmse, 'stage_seconds': timings})
+        _lap(timings, 'save', clock)
         
+        self.training_timings = timings
+        print("Training stages: " + ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in timings.items()))
         print("Model training complete!")
-        return {'mae': mae, 'rmse': rmse}
+        return {'mae': mae, 'rmse': rmse, 'stage_seconds': timings}
 
-    def predict(self, driver, team, grid, avg_recent_finish=None, recent_points=None):
-        if not self.is_trained:
-            if os.path.exists(self.model_path):
-                print(f"Loading model from {self.model_path}...")
+    @staticmethod
+    def _extend_encoder(encoder, values):
+        # Unseen labels are appended so existing codes, and the trees already
+        # splitting on them, stay valid. Codes come from the classes_ order,
+        # so encoder.transform (which assumes sorted classes) is not used.
+        classes = list(encoder.classes_)
+        known = set(classes)
+        classes += sorted(v for v in pd.unique(values.astype(object)) if v not in known)
+        encoder.classes_ = np.array(classes, dtype=object)
+        codes = {label: i for i, label in enumerate(classes)}
+        return values.astype(object).map(codes).to_numpy(dtype=np.int64)
+
+    def update(self, data, tree_fraction=INCREMENTAL_TREE_FRACTION):
+        # Incremental retrain of a loaded model on `data` (every round, old and
+        # new). For each round not seen before, a slice of each forest
+        # (tree_fraction of its trees) is regrown on the full data and the
+        # oldest trees are retired, so forest size stays fixed. Returns None
+        # when there is nothing new or the model doesn't track its rounds.
+        if not self._ensure_loaded() or not self.trained_rounds:
+            return None
+        from sklearn.ensemble import RandomForestRegressor
+        from sklearn.metrics import mean_absolute_error, mean_squared_error
+        
+        seen = set(self.trained_rounds)
+        rounds = _rounds_in(data)
+        new_rounds = [r for r in rounds if r not in seen]
+        if not new_rounds:
+            return None
+        
+        print(f"Updating model with {len(new_rounds)} new round(s): {new_rounds}")
+        timings = {}
+        clock = time.perf_counter()
+        
+        position_forest = self._as_compiled(self.position_model)
+        win_forest = self._as_compiled(self.win_prob_model)
+        X, y = self._feature_matrix(
+            data,
+            self._extend_encoder(self.le_driver, data['driver']),
+            self._extend_encoder(self.le_team, data['team'])
+        )
+        is_new = pd.MultiIndex.from_arrays([data['year'], data['round']]).isin(new_rounds)
+        clock = _lap(timings, 'encode', clock)
+        
+        # Forward error: the current model on rounds it has never seen.
+        y_pred = position_forest.predict(X[is_new])
+        mae = mean_absolute_error(y[is_new], y_pred)
+        rmse = float(np.sqrt(mean_squared_error(y[is_new], y_pred)))
+        print(f"Position Model (before update, new rounds) - MAE: {mae:.2f}, RMSE: {rmse:.2f}")
+        clock = _lap(timings, 'evaluate', clock)
+        
+        seed = len(seen)
+        n_position = min(position_forest.n_trees, max(1, round(position_forest.n_trees * tree_fraction * len(new_rounds))))
+        n_win = min(win_forest.n_trees, max(1, round(win_forest.n_trees * tree_fraction * len(new_rounds))))
+        
+        new_position = RandomForestRegressor(
+            **{**POSITION_FOREST_PARAMS, 'n_estimators': n_position, 'random_state': seed}
+        ).fit(X, y)
+        clock = _lap(timings, 'position_fit', clock)
+        
+        # Stacked inputs from the new trees' out-of-bag predictions; the rare
+        # row no new tree left out falls back to the full new slice.
+        oof_position = np.ravel(new_position.oob_prediction_)
+        missing = ~(oof_position >= 1)
+        if missing.any():
+            oof_position[missing] = new_position.predict(X[missing])
+        X_win = X.copy()
+        X_win['predicted_position'] = np.clip(np.rint(oof_position), 1, 20)
+        clock = _lap(timings, 'out_of_fold', clock)
+        
+        new_win = RandomForestRegressor(
+            **{**WIN_FOREST_PARAMS, 'n_estimators': n_win, 'random_state': seed}
+        ).fit(X_win, (y == 1).astype(int))
+        clock = _lap(timings, 'win_fit', clock)
+        
+        self.position_model = position_forest.merge(
+            CompiledForest.from_estimator(new_position), max_trees=position_forest.n_trees
+        )
+        self.win_prob_model = win_forest.merge(
+            CompiledForest.from_estimator(new_win), max_trees=win_forest.n_trees
+        )
+        self.driver_stats, self.team_stats = build_stats(
+            data, self.le_driver.classes_, X['driver_enc'].to_numpy(),
+            self.le_team.classes_, X['team_enc'].to_numpy()
+        )
+        self.trained_rounds = sorted(seen | set(rounds))
+        clock = _lap(timings, 'stats', clock)
+        
+        self._build_fast_path()
+        clock = _lap(timings, 'fast_path', clock)
+        
+        scores = self._save(mae, rmse, timings, clock)
+        scores['new_rounds'] = new_rounds
+        return scores
+
+    @staticmethod
+    def _as_compiled(model):
+        return model if isinstance(model, CompiledForest) else CompiledForest.from_estimator(model)
+
+    def _out_of_fold_positions(self, X_train, y_train):
+        # Bagged forests give these for free as out-of-bag predictions;
+        # otherwise fall back to 5-fold cross-validated predictions.
+        oob = getattr(self.position_model, 'oob_prediction_', None)
+        if oob is not None:
+            return np.ravel(oob)
+        from sklearn.base import clone
+        from sklearn.model_selection import cross_val_predict
+        return cross_val_predict(clone(self.position_model), X_train, y_train, cv=5)
+
+    def _ensure_loaded(self):
+        if self.is_trained:
+            return True
+        
+        with _load_lock:
+            if self.is_trained:
+                return True
+            if not os.path.exists(self.model_path):
+                return False
+            
+            print(f"Loading model from {self.model_path}...")
+            start = time.perf_counter()
+            if is_artifact(self.model_path):
+                self._load_artifact()
+            else:
+                import joblib
                 loaded = joblib.load(self.model_path)
                 self.position_model = loaded.position_model
                 self.win_prob_model = loaded.win_prob_model
                 self.le_driver = loaded.le_driver
                 self.le_team = loaded.le_team
-                self.driver_stats = loaded.driver_stats
-                self.team_stats = loaded.team_stats
+                self.driver_stats = StatsIndex.from_mapping(loaded.driver_stats, self.le_driver.classes_)
+                self.team_stats = StatsIndex.from_mapping(loaded.team_stats, self.le_team.classes_)
                 self.feature_names = loaded.feature_names
-                self.is_trained = True
-            else:
-                return {
-                    'predicted_position': grid,
-                    'win_probability': 0.05,
-                    'podium_probability': 0.15,
-                    'confidence': 0.0
-                }
+            self._build_fast_path()
+            self.load_seconds = time.perf_counter() - start
+            self.is_trained = True
+            return True
 
-        try:
-            if driver not in self.le_driver.classes_:
-                driver_similar = self._find_similar_driver(driver)
-                if driver_similar:
-                    driver = driver_similar
-                else:
-                    return self._fallback_prediction(grid)
-            
-            if team not in self.le_team.classes_:
-                team_similar = self._find_similar_team(team)
-                if team_similar:
-                    team = team_similar
-                else:
-                    return self._fallback_prediction(grid)
-            
+    def _load_artifact(self):
+        # Forests come back as memory-mapped CompiledForest instances; the
+        # encoders only need their classes to transform.
+        artifact = load_artifact(self.model_path)
+        self.position_model = artifact['forests']['position_model']
+        self.win_prob_model = artifact['forests']['win_prob_model']
+        self.le_driver = FittedLabels(artifact['driver_classes'])
+        self.le_team = FittedLabels(artifact['team_classes'])
+        self.driver_stats = StatsIndex.from_mapping(artifact['driver_stats'], self.le_driver.classes_)
+        self.team_stats = StatsIndex.from_mapping(artifact['team_stats'], self.le_team.classes_)
+        self.feature_names = artifact['feature_names']
+        self.trained_rounds = artifact['rounds'] or None
+        self.parent_version = artifact['manifest'].get('parent_version')
+
+    def load(self):
+        if not self._ensure_loaded():
+            print(f"No trained model at {self.model_path}; serving fallback predictions.")
+            return False
+        
+        if self.warmup_seconds is None and self.driver_stats:
+            start = time.perf_counter()
+            driver = next(iter(self.driver_stats))
+            team = next(iter(self.team_stats), None)
+            self.predict(driver, team, 1)
+            if WARM_PREDICTION_CACHE:
+                self.warm_prediction_cache()
+            self.warmup_seconds = time.perf_counter() - start
+        
+        self.ready = True
+        print(f"Model ready (load {self.load_seconds or 0.0:.3f}s, warm-up {self.warmup_seconds or 0.0:.3f}s)")
+        return True
+
+    def _build_fast_path(self):
+        self._cache_scope = (os.path.abspath(self.model_path), next(_cache_generations))
+        self._driver_codes = {d: i for i, d in enumerate(self.le_driver.classes_)}
+        self._team_codes = {t: i for i, t in enumerate(self.le_team.classes_)}
+        
+        if isinstance(self.position_model, CompiledForest):
+            # Compact artifacts only carry compiled forests.
+            self._position_trees = None
+            self._win_trees = None
+            self._position_engine = self.position_model
+            self._win_engine = self.win_prob_model
+            return
+        
+        if hasattr(self.position_model, 'estimators_') and hasattr(self.win_prob_model, 'estimators_'):
+            self._position_trees = [e.tree_ for e in self.position_model.estimators_]
+            self._win_trees = [e.tree_ for e in self.win_prob_model.estimators_]
+        else:
+            self._position_trees = None
+            self._win_trees = None
+        
+        if self.inference_backend == 'compiled' and self._position_trees is not None:
+            self._position_engine = CompiledForest.from_estimator(self.position_model)
+            self._win_engine = CompiledForest.from_estimator(self.win_prob_model)
+        else:
+            self._position_engine = None
+            self._win_engine = None
+
+    def use_inference_backend(self, backend):
+        self.inference_backend = backend
+        if self.is_trained:
+            self._build_fast_path()
+
+    @staticmethod
+    def _forest_predict_row(trees, engine, buffer):
+        if engine is not None:
+            return engine.predict(buffer)[0]
+        
+        # Same accumulation as RandomForestRegressor.predict, minus input
+        # validation, DataFrame handling and joblib dispatch.
+        total = 0.0
+        for tree in trees:
+            total += tree.predict(buffer)[0, 0]
+        return total / len(trees)
+
+    @staticmethod
+    def _forest_predict_batch(model, engine, features):
+        if engine is not None:
+            return engine.predict(features)
+        return model.predict(features)
+
+    @staticmethod
+    def _forest_predict_per_tree(model, engine, features):
+        if engine is not None:
+            return engine.predict_per_tree(features)
+        X = np.ascontiguousarray(features, dtype=np.float32)
+        return np.column_stack([e.tree_.predict(X)[:, 0] for e in model.estimators_])
+
+    def position_samples(self, entries):
+        # Per-tree predicted finishing positions, one row per entry in input
+        # order, plus the resolved driver names (None where unresolvable).
+        # Entries the model can't place get their grid slot from every tree.
+        samples = np.array([[float(e['grid'])] for e in entries])
+        drivers = [None] * len(entries)
+        if not entries or not self._ensure_loaded():
+            return samples, drivers
+
+        rows = []
+        row_index = []
+        for i, entry in enumerate(entries):
+            resolved = self._resolve_entry(entry['driver'], entry['team'])
+            if resolved is None:
+                continue
+            driver, team = resolved
+            drivers[i] = driver
+            rows.append(self._feature_row(
+                driver, team, entry['grid'],
+                entry.get('avg_recent_finish'), entry.get('recent_points')
+            ))
+            row_index.append(i)
+
+        if not rows:
+            return samples, drivers
+
+        per_tree = self._forest_predict_per_tree(
+            self.position_model, self._position_engine, pd.DataFrame(rows)
+        )
+        samples = np.repeat(samples, per_tree.shape[1], axis=1)
+        samples[row_index] = per_tree
+        return samples, drivers
+
+    def _predict_fast(self, driver, team, grid, avg_recent_finish, recent_points):
+        started = time.perf_counter()
+        driver_code = self._driver_codes.get(driver)
+        if driver_code is None:
+            driver = self._find_similar_driver(driver)
+            driver_code = self._driver_codes.get(driver)
+            if driver_code is None:
+                return self._fallback_prediction(grid)
+        
+        team_code = self._team_codes.get(team)
+        if team_code is None:
+            team = self._find_similar_team(team)
+            team_code = self._team_codes.get(team)
+            if team_code is None:
+                return self._fallback_prediction(grid)
+        
+        # Stats rows share the encoder codes, so these are plain array reads.
+        driver_columns = self.driver_stats.columns
+        if avg_recent_finish is None:
+            avg_recent_finish = driver_columns['avg_finish'][driver_code]
+        if recent_points is None:
+            recent_points = driver_columns['avg_points'][driver_code] * 3
+        
+        position_buf, win_buf = _get_row_buffers()
+        row = position_buf[0]
+        row[0] = driver_code
+        row[1] = team_code
+        row[2] = grid
+        row[3] = avg_recent_finish
+        row[4] = recent_points
+        row[5] = self.team_stats.columns['avg_finish'][team_code]
+        features_built = time.perf_counter()
+        
+        predicted_position = self._forest_predict_row(self._position_trees, self._position_engine, position_buf)
+        predicted_position = max(1, min(20, int(round(predicted_position))))
+        position_done = time.perf_counter()
+        
+        win_buf[0, :6] = row
+        win_buf[0, 6] = predicted_position
+        win_prob = max(0.01, min(0.95, self._forest_predict_row(self._win_trees, self._win_engine, win_buf)))
+        win_done = time.perf_counter()
+        
+        podium_prob = self._calculate_podium_probability(
+            predicted_position, grid, driver, team
+        )
+        podium_done = time.perf_counter()
+        
+        confidence = self._calculate_confidence(driver, team, grid)
+        metrics.record_predict_stages(
+            'single', (started, features_built, position_done, win_done, podium_done, time.perf_counter())
+        )
+        
+        return {
+            'predicted_position': predicted_position,
+            'win_probability': round(win_prob, 4),
+            'podium_probability': round(podium_prob, 4),
+            'confidence': round(confidence, 4)
+        }
+
+    def _resolve_entry(self, driver, team):
+        if driver not in self.le_driver.classes_:
+            driver = self._find_similar_driver(driver)
+            if not driver:
+                return None
+        
+        if team not in self.le_team.classes_:
+            team = self._find_similar_team(team)
+            if not team:
+                return None
+        
+        return driver, team
+
+    def _feature_row(self, driver, team, grid, avg_recent_finish=None, recent_points=None):
+        if avg_recent_finish is None:
+            avg_recent_finish = self.driver_stats.value(driver, 'avg_finish', 10.0)
+        if recent_points is None:
+            recent_points = self.driver_stats.value(driver, 'avg_points', 0.0) * 3
+        
+        team_avg_finish = self.team_stats.value(team, 'avg_finish', 10.0)
+        
+        if self._driver_codes:
+            driver_enc, team_enc = self._driver_codes[driver], self._team_codes[team]
+        else:
             driver_enc = self.le_driver.transform([driver])[0]
             team_enc = self.le_team.transform([team])[0]
-            
-            if avg_recent_finish is None:
-                avg_recent_finish = self.driver_stats.get(driver, {}).get('avg_finish', 10.0)
-            if recent_points is None:
-                recent_points = self.driver_stats.get(driver, {}).get('avg_points', 0.0) * 3
-            
-            team_avg_finish = self.team_stats.get(team, {}).get('avg_finish', 10.0)
-            
-            features = pd.DataFrame([{
-                'driver_enc': driver_enc,
-                'team_enc': team_enc,
-                'grid_position': grid,
-                'avg_recent_finish': avg_recent_finish,
-                'recent_points': recent_points,
-                'team_avg_finish': team_avg_finish
-            }])
-            
-            predicted_position = self.position_model.predict(features)[0]
-            predicted_position = max(1, min(20, int(round(predicted_position))))
-            
-            features_with_pred = features.copy()
-            features_with_pred['predicted_position'] = predicted_position
-            
-            win_prob_raw = self.win_prob_model.predict(features_with_pred)[0]
+        
+        return {
+            'driver_enc': driver_enc,
+            'team_enc': team_enc,
+            'grid_position': grid,
+            'avg_recent_finish': avg_recent_finish,
+            'recent_points': recent_points,
+            'team_avg_finish': team_avg_finish
+        }
 
-            win_prob = max(0.01, min(0.95, win_prob_raw))
-            
-            podium_prob = self._calculate_podium_probability(
-                predicted_position, grid, driver, team
+    def _untrained_prediction(self, grid):
+        return {
+            'predicted_position': grid,
+            'win_probability': 0.05,
+            'podium_probability': 0.15,
+            'confidence': 0.0
+        }
+
+    def predict(self, driver, team, grid, avg_recent_finish=None, recent_points=None):
+        if not self._ensure_loaded():
+            metrics.PREDICTION_FALLBACKS.inc('untrained')
+            return self._untrained_prediction(grid)
+        self._count_unknown(driver, team)
+        
+        if not self.use_prediction_cache:
+            try:
+                return self._predict_uncached(driver, team, grid, avg_recent_finish, recent_points)
+            except Exception as e:
+                return self._prediction_error(e, grid)
+        
+        key = (self._cache_scope, driver, team, grid, avg_recent_finish, recent_points)
+        result = _prediction_cache.get(key)
+        if result is None:
+            # Errors fall back without being cached, so they are retried.
+            try:
+                result = self._predict_uncached(driver, team, grid, avg_recent_finish, recent_points)
+            except Exception as e:
+                return self._prediction_error(e, grid)
+            _prediction_cache.put(key, result)
+        # Callers may annotate the dict; keep the cached copy pristine.
+        return dict(result)
+
+    def warm_prediction_cache(self, grid_slots=20):
+        # Precompute every known driver at every grid slot with their latest
+        # team (all teams for artifacts that predate per-driver teams), in one
+        # batched forest pass.
+        if not self._ensure_loaded():
+            return 0
+        
+        combos = []
+        for driver in self.driver_stats:
+            team = self.driver_stats.value(driver, 'team')
+            teams = [team] if team in self._team_codes else list(self.team_stats)
+            combos.extend(
+                (driver, team, grid) for team in teams for grid in range(1, grid_slots + 1)
+                if team in self._team_codes and driver in self._driver_codes
             )
+        if not combos:
+            return 0
+        
+        rows = [self._feature_row(driver, team, grid) for driver, team, grid in combos]
+        for (driver, team, grid), result in zip(combos, self._score_rows(rows, combos)):
+            _prediction_cache.put((self._cache_scope, driver, team, grid, None, None), result)
+        return len(combos)
+
+    def _count_unknown(self, driver, team):
+        if driver not in self._driver_codes:
+            metrics.UNKNOWN_ENTITIES.inc('driver')
+        if team not in self._team_codes:
+            metrics.UNKNOWN_ENTITIES.inc('team')
+
+    def _prediction_error(self, error, grid):
+        print(f"Prediction error: {error}")
+        return self._fallback_prediction(grid, reason='error')
+
+    def _predict_uncached(self, driver, team, grid, avg_recent_finish=None, recent_points=None):
+        if self.fast_path and (self._position_trees is not None or self._position_engine is not None):
+            return self._predict_fast(driver, team, grid, avg_recent_finish, recent_points)
+        
+        started = time.perf_counter()
+        resolved = self._resolve_entry(driver, team)
+        if resolved is None:
+            return self._fallback_prediction(grid)
+        driver, team = resolved
+        
+        features = pd.DataFrame([self._feature_row(
+            driver, team, grid, avg_recent_finish, recent_points
+        )])
+        features_built = time.perf_counter()
+        
+        predicted_position = self.position_model.predict(features)[0]
+        predicted_position = max(1, min(20, int(round(predicted_position))))
+        position_done = time.perf_counter()
+        
+        features_with_pred = features.copy()
+        features_with_pred['predicted_position'] = predicted_position
+        
+        win_prob_raw = self.win_prob_model.predict(features_with_pred)[0]
+
+        win_prob = max(0.01, min(0.95, win_prob_raw))
+        win_done = time.perf_counter()
+        
+        podium_prob = self._calculate_podium_probability(
+            predicted_position, grid, driver, team
+        )
+        podium_done = time.perf_counter()
+        
+        confidence = self._calculate_confidence(driver, team, grid)
+        metrics.record_predict_stages(
+            'single', (started, features_built, position_done, win_done, podium_done, time.perf_counter())
+        )
+        
+        return {
+            'predicted_position': predicted_position,
+            'win_probability': round(win_prob, 4),
+            'podium_probability': round(podium_prob, 4),
+            'confidence': round(confidence, 4)
+        }
+
+    def predict_grid(self, entries):
+        # entries: [{'driver', 'team', 'grid', optional 'avg_recent_finish'/'recent_points'}]
+        # Both forests run once over the whole field; results keep input order.
+        if not self._ensure_loaded():
+            metrics.PREDICTION_FALLBACKS.inc('untrained', amount=len(entries))
+            results = [self._untrained_prediction(e['grid']) for e in entries]
+            return self._normalize_field(results)
+
+        results = [None] * len(entries)
+        rows = []
+        row_index = []
+        resolved_entries = []
+        
+        try:
+            for i, entry in enumerate(entries):
+                self._count_unknown(entry['driver'], entry['team'])
+                resolved = self._resolve_entry(entry['driver'], entry['team'])
+                if resolved is None:
+                    results[i] = self._fallback_prediction(entry['grid'])
+                    continue
+                
+                driver, team = resolved
+                rows.append(self._feature_row(
+                    driver, team, entry['grid'],
+                    entry.get('avg_recent_finish'), entry.get('recent_points')
+                ))
+                row_index.append(i)
+                resolved_entries.append((driver, team, entry['grid']))
             
+            if rows:
+                for i, result in zip(row_index, self._score_rows(rows, resolved_entries)):
+                    results[i] = result
+        
+        except Exception as e:
+            print(f"Grid prediction error: {e}")
+            results = [self._fallback_prediction(entry['grid'], reason='error') for entry in entries]
+        
+        return self._normalize_field(results)
+
+    def _score_rows(self, rows, resolved_entries):
+        # Both forests over a batch of feature rows; same outputs as predict().
+        started = time.perf_counter()
+        features = pd.DataFrame(rows)
+        features_built = time.perf_counter()
+        
+        predicted = self._forest_predict_batch(self.position_model, self._position_engine, features)
+        predicted = np.clip(np.rint(predicted), 1, 20).astype(int)
+        position_done = time.perf_counter()
+        
+        features['predicted_position'] = predicted
+        win_raw = self._forest_predict_batch(self.win_prob_model, self._win_engine, features)
+        win_probs = np.clip(win_raw, 0.01, 0.95)
+        win_done = time.perf_counter()
+        
+        podium_probs = [
+            self._calculate_podium_probability(int(predicted[k]), grid, driver, team)
+            for k, (driver, team, grid) in enumerate(resolved_entries)
+        ]
+        podium_done = time.perf_counter()
+        
+        results = []
+        for k, (driver, team, grid) in enumerate(resolved_entries):
             confidence = self._calculate_confidence(driver, team, grid)
             
-            return {
-                'predicted_position': predicted_position,
-                'win_probability': round(win_prob, 4),
-                'podium_probability': round(podium_prob, 4),
+            results.append({
+                'predicted_position': int(predicted[k]),
+                'win_probability': round(float(win_probs[k]), 4),
+                'podium_probability': round(podium_probs[k], 4),
                 'confidence': round(confidence, 4)
-            }
+            })
+        metrics.record_predict_stages(
+            'batch', (started, features_built, position_done, win_done, podium_done, time.perf_counter())
+        )
+        return results
+
+    def _normalize_field(self, results):
+        win_total = sum(r['win_probability'] for r in results)
+        # Podium shares sum to the number of podium places, capped at 1 each.
+        podium_shares = _capped_shares([r['podium_probability'] for r in results], min(3, len(results)))
         
-        except Exception as e:
-            print(f"Prediction error: {e}")
-            return self._fallback_prediction(grid)
+        for r, podium_share in zip(results, podium_shares):
+            r['field_win_probability'] = round(
+                r['win_probability'] / win_total, 4
+            ) if win_total > 0 else 0.0
+            r['field_podium_probability'] = round(float(podium_share), 4)
+        
+        return results
     
     def _find_similar_driver(self, driver):
         if self.driver_stats:
@@ -219,7 +876,8 @@ class RacePredictor:
             return list(self.team_stats.keys())[0]
         return None
     
-    def _fallback_prediction(self, grid):
+    def _fallback_prediction(self, grid, reason='unresolved'):
+        metrics.PREDICTION_FALLBACKS.inc(reason)
         base_prob = max(0.01, 0.5 / grid)
         return {
             'predicted_position': grid,
@@ -241,7 +899,7 @@ class RacePredictor:
             base_prob = 0.02
         
         if driver in self.driver_stats:
-            podium_rate = self.driver_stats[driver]['podiums'] / max(1, self.driver_stats[driver]['total_races'])
+            podium_rate = self.driver_stats.value(driver, 'podiums') / max(1, self.driver_stats.value(driver, 'total_races'))
             base_prob = (base_prob + podium_rate) / 2
         
         if grid <= 3:
@@ -255,7 +913,7 @@ class RacePredictor:
         confidence = 0.7
         
         if driver in self.driver_stats:
-            races = self.driver_stats[driver]['total_races']
+            races = self.driver_stats.value(driver, 'total_races')
             confidence += min(0.2, races / 100)
         
         if 1 <= grid <= 10:
@@ -263,22 +921,132 @@ class RacePredictor:
         
         return min(1.0, confidence)
 
-def train_model_from_data():
+def _follow_current_pointer():
+    # With several workers only one of them runs a given training job; the
+    # others pick up the published model when CURRENT changes. The new model
+    # loads and warms up on a background thread while requests keep being
+    # served by the old one.
+    global _pointer_checked_at, _pointer_loading
+    now = time.monotonic()
+    if now - _pointer_checked_at < POINTER_CHECK_SECONDS or not _pointer_lock.acquire(blocking=False):
+        return
+    try:
+        _pointer_checked_at = now
+        if _pointer_loading is not None:
+            return
+        path = current_model_path()
+        if path != predictor.model_path and os.path.exists(path):
+            _pointer_loading = path
+            threading.Thread(target=_load_published, args=(path,), name='f1-model-reload', daemon=True).start()
+    finally:
+        _pointer_lock.release()
+
+
+def _load_published(path):
+    global _pointer_loading
+    try:
+        new_predictor = RacePredictor(model_path=path)
+        if new_predictor.load():
+            swap_predictor(new_predictor)
+    except Exception as e:
+        print(f"Could not load published model {path}: {e}")
+    finally:
+        _pointer_loading = None
+
+
+def prediction_cache_stats():
+    return _prediction_cache.stats()
+
+
+def _model_metrics():
+    current = predictor
+    # Compact artifacts run on compiled forests whatever inference_backend asks for.
+    backend = 'compiled' if current._position_engine is not None else 'sklearn'
+    return [
+        ('f1_model_loaded', 'gauge', 'Whether the serving model is loaded.', [({}, int(current.is_trained))]),
+        ('f1_model_load_seconds', 'gauge', 'Time taken to load the serving model.',
+         [({}, current.load_seconds)]),
+        ('f1_model_warmup_seconds', 'gauge', 'Time taken to warm up the serving model.',
+         [({}, current.warmup_seconds)]),
+        ('f1_model_info', 'gauge', 'Serving model version and inference backend.',
+         [({'version': current.version, 'backend': backend}, 1)]),
+    ]
+
+
+metrics.register_collector(_model_metrics)
+
+
+def get_predictor():
+    _follow_current_pointer()
+    return predictor
+
+
+def swap_predictor(new_predictor):
+    # Rebinding a module global is atomic, so requests see either the old or
+    # the new fully-loaded predictor, never one that is mid-training.
+    global predictor
+    old_predictor = predictor
+    predictor = new_predictor
+    return old_predictor
+
+
+def train_model_from_data(publish=True, incremental=False):
+    try:
+        from .data_collector import F1DataCollector, FEATURE_SOURCE_COLUMNS
+    except ImportError:
+        from data_collector import F1DataCollector, FEATURE_SOURCE_COLUMNS
+    
+    timings = {}
+    clock = time.perf_counter()
+    
     print("Collecting F1 data from 2025 season...")
     collector = F1DataCollector()
     
-    raw_data = collector.collect_historical_data(start_year=2025, end_year=2025)
+    raw_data = collector.collect_historical_data(
+        start_year=2025, end_year=2025, columns=FEATURE_SOURCE_COLUMNS
+    )
+    clock = _lap(timings, 'collect', clock)
     
     print("Engineering features...")
     featured_data = collector.engineer_features(raw_data)
+    _lap(timings, 'engineer_features', clock)
     
     print(f"Total training samples: {len(featured_data)}")
     
-    global predictor
-    predictor = RacePredictor()
-    metrics = predictor.train(featured_data)
+    scores = None
+    mode = 'full'
+    new_predictor = RacePredictor(model_path=new_model_path())
+    if incremental:
+        # Update a copy of the current model; the live one keeps serving.
+        base = RacePredictor(model_path=current_model_path())
+        if base._ensure_loaded() and base.trained_rounds:
+            base.parent_version = base.version
+            base.model_path = new_predictor.model_path
+            scores = base.update(featured_data)
+            if scores is None:
+                print("No new rounds since the current model; nothing to update.")
+                return {
+                    'mode': 'unchanged', 'mae': None, 'rmse': None, 'stage_seconds': timings,
+                    'version': get_predictor().version, 'model_path': get_predictor().model_path
+                }
+            new_predictor = base
+            mode = 'incremental'
+        else:
+            print("Current model has no round history; running a full retrain.")
+    
+    if scores is None:
+        scores = new_predictor.train(featured_data)
+    scores['stage_seconds'] = {**timings, **scores['stage_seconds']}
+    scores['mode'] = mode
+    
+    if publish:
+        publish_model(new_predictor.model_path)
+        new_predictor.load()
+        swap_predictor(new_predictor)
     
-    return metrics
+    scores['version'] = new_predictor.version
+    scores['model_path'] = new_predictor.model_path
+    return scores
 
 predictor = RacePredictor()
 
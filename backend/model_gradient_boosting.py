@@ -7,26 +7,33 @@ from sklearn.metrics import mean_absolute_error, mean_squared_error
 import joblib
 import os
 try:
-    from .data_collector import F1DataCollector
+    from .data_collector import F1DataCollector, FEATURE_SOURCE_COLUMNS
+    from .stats_index import build_stats
+    from .tree_engine import CompiledForest
 except ImportError:
-    from data_collector import F1DataCollector
+    from data_collector import F1DataCollector, FEATURE_SOURCE_COLUMNS
+    from stats_index import build_stats
+    from tree_engine import CompiledForest
+
+POSITION_GB_PARAMS = {
+    'n_estimators': 200,
+    'learning_rate': 0.1,
+    'max_depth': 5,
+    'min_samples_split': 5,
+    'min_samples_leaf': 2,
+    'random_state': 42
+}
+WIN_GB_PARAMS = {
+    'n_estimators': 150,
+    'learning_rate': 0.1,
+    'max_depth': 4,
+    'random_state': 42
+}
 
 class GradientBoostingPredictor:
     def __init__(self):
-        self.position_model = GradientBoostingRegressor(
-            n_estimators=200,
-            learning_rate=0.1,
-            max_depth=5,
-            min_samples_split=5,
-            min_samples_leaf=2,
-            random_state=42
-        )
-        self.win_prob_model = GradientBoostingRegressor(
-            n_estimators=150,
-            learning_rate=0.1,
-            max_depth=4,
-            random_state=42
-        )
+        self.position_model = GradientBoostingRegressor(**POSITION_GB_PARAMS)
+        self.win_prob_model = GradientBoostingRegressor(**WIN_GB_PARAMS)
         
         self.le_driver = LabelEncoder()
         self.le_team = LabelEncoder()
@@ -36,6 +43,36 @@ class GradientBoostingPredictor:
         self.driver_stats = {}
         self.team_stats = {}
         self.feature_names = []
+        
+        # 'sklearn' uses the fitted estimators; 'compiled' uses tree_engine.CompiledForest.
+        self.inference_backend = os.environ.get('F1_INFERENCE_BACKEND', 'sklearn')
+        self._position_engine = None
+        self._win_engine = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_position_engine'] = None
+        state['_win_engine'] = None
+        return state
+
+    def _build_engines(self):
+        if self.inference_backend == 'compiled':
+            self._position_engine = CompiledForest.from_estimator(self.position_model)
+            self._win_engine = CompiledForest.from_estimator(self.win_prob_model)
+        else:
+            self._position_engine = None
+            self._win_engine = None
+
+    def use_inference_backend(self, backend):
+        self.inference_backend = backend
+        if self.is_trained:
+            self._build_engines()
+
+    @staticmethod
+    def _model_predict(model, engine, features):
+        if engine is not None:
+            return engine.predict(features)
+        return model.predict(features)
 
     def prepare_features(self, data):
         df = data.copy()
@@ -99,26 +136,13 @@ class GradientBoostingPredictor:
         print("Training win probability model...")
         self.win_prob_model.fit(X_win, y_win)
         
-        for driver in data['driver'].unique():
-            driver_data = data[data['driver'] == driver]
-            self.driver_stats[driver] = {
-                'avg_finish': driver_data['finish_position'].mean(),
-                'avg_grid': driver_data['grid_position'].mean(),
-                'wins': (driver_data['finish_position'] == 1).sum(),
-                'podiums': (driver_data['finish_position'] <= 3).sum(),
-                'total_races': len(driver_data),
-                'avg_points': driver_data['points'].mean()
-            }
-        
-        for team in data['team'].unique():
-            team_data = data[data['team'] == team]
-            self.team_stats[team] = {
-                'avg_finish': team_data['finish_position'].mean(),
-                'wins': (team_data['finish_position'] == 1).sum(),
-                'total_races': len(team_data)
-            }
+        self.driver_stats, self.team_stats = build_stats(
+            data, self.le_driver.classes_, X['driver_enc'].to_numpy(),
+            self.le_team.classes_, X['team_enc'].to_numpy()
+        )
         
         self.is_trained = True
+        self._build_engines()
         
         print(f"Saving model to {self.model_path}...")
         joblib.dump(self, self.model_path)
@@ -138,6 +162,7 @@ class GradientBoostingPredictor:
                 self.driver_stats = loaded.driver_stats
                 self.team_stats = loaded.team_stats
                 self.feature_names = loaded.feature_names
+                self._build_engines()
                 self.is_trained = True
             else:
                 return {
@@ -181,13 +206,13 @@ class GradientBoostingPredictor:
                 'team_avg_finish': team_avg_finish
             }])
             
-            predicted_position = self.position_model.predict(features)[0]
+            predicted_position = self._model_predict(self.position_model, self._position_engine, features)[0]
             predicted_position = max(1, min(20, int(round(predicted_position))))
             
             features_with_pred = features.copy()
             features_with_pred['predicted_position'] = predicted_position
             
-            win_prob_raw = self.win_prob_model.predict(features_with_pred)[0]
+            win_prob_raw = self._model_predict(self.win_prob_model, self._win_engine, features_with_pred)[0]
             win_prob = max(0.0, min(1.0, win_prob_raw))
             
             podium_prob = self._calculate_podium_probability(
@@ -265,7 +290,9 @@ def train_model_from_data():
     print("Collecting F1 data from 2025 season...")
     collector = F1DataCollector()
     
-    raw_data = collector.collect_historical_data(start_year=2025, end_year=2025)
+    raw_data = collector.collect_historical_data(
+        start_year=2025, end_year=2025, columns=FEATURE_SOURCE_COLUMNS
+    )
     
     print("Engineering features...")
     featured_data = collector.engineer_features(raw_data)
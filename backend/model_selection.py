@@ -0,0 +1,237 @@
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+import joblib
+import numpy as np
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.model_selection import ParameterGrid, TimeSeriesSplit
+try:
+    from .data_collector import F1DataCollector, FEATURE_SOURCE_COLUMNS
+    from .model import ARTIFACT_DIR, POSITION_FOREST_PARAMS, prepare_features
+    from .model_gradient_boosting import POSITION_GB_PARAMS
+    from .tree_engine import CompiledForest
+except ImportError:
+    from data_collector import F1DataCollector, FEATURE_SOURCE_COLUMNS
+    from model import ARTIFACT_DIR, POSITION_FOREST_PARAMS, prepare_features
+    from model_gradient_boosting import POSITION_GB_PARAMS
+    from tree_engine import CompiledForest
+
+# Time-aware model selection for the position model: every candidate is fitted
+# on earlier rounds and scored on the rounds that follow, the way it is used
+# once deployed. Candidates x folds run in a process pool; fold matrices are
+# written once as .npy files that every worker memory-maps.
+SELECTION_DIR = os.path.join(ARTIFACT_DIR, 'selection')
+LEADERBOARD_PATH = os.path.join(SELECTION_DIR, 'leaderboard.json')
+
+# Each fit is single-threaded; the pool provides the parallelism.
+ESTIMATORS = {
+    'random_forest': (RandomForestRegressor, {**POSITION_FOREST_PARAMS, 'oob_score': False, 'n_jobs': 1}),
+    'gradient_boosting': (GradientBoostingRegressor, POSITION_GB_PARAMS),
+}
+
+PARAM_GRID = {
+    'random_forest': {
+        'n_estimators': [100, 200],
+        'max_depth': [10, 15],
+        'min_samples_leaf': [2, 5]
+    },
+    'gradient_boosting': {
+        'n_estimators': [100, 200],
+        'max_depth': [3, 5],
+        'learning_rate': [0.05, 0.1]
+    },
+}
+
+# Single-row predictions timed per fitted candidate, through the compiled
+# engine that serves /predict.
+LATENCY_CALLS = 200
+
+
+def time_folds(data, n_splits=4):
+    # Expanding-window folds over rounds in calendar order: each fold trains
+    # on every round before its test block.
+    key = data['year'].to_numpy() * 100 + data['round'].to_numpy()
+    rounds = np.unique(key)
+    if len(rounds) <= n_splits:
+        raise ValueError(f"Need more than {n_splits} rounds for {n_splits} time folds, got {len(rounds)}")
+
+    folds = []
+    for train_rounds, test_rounds in TimeSeriesSplit(n_splits=n_splits).split(rounds):
+        folds.append((
+            np.flatnonzero(np.isin(key, rounds[train_rounds])),
+            np.flatnonzero(np.isin(key, rounds[test_rounds])),
+            [int(r) for r in rounds[test_rounds]]
+        ))
+    return folds
+
+
+def cache_folds(X, y, folds, cache_root=SELECTION_DIR):
+    # Keyed by the content of the matrices and the split, so reruns on the
+    # same data reuse the files.
+    digest = joblib.hash((X, y, [(train, test) for train, test, _ in folds]))
+    path = os.path.join(cache_root, f'folds_{digest}')
+    if os.path.isdir(path):
+        return path
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        shutil.rmtree(tmp_path)
+    os.makedirs(tmp_path)
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    y = np.asarray(y, dtype=np.float64)
+    for i, (train, test, _) in enumerate(folds):
+        np.save(os.path.join(tmp_path, f'{i}_X_train.npy'), X[train])
+        np.save(os.path.join(tmp_path, f'{i}_y_train.npy'), y[train])
+        np.save(os.path.join(tmp_path, f'{i}_X_test.npy'), X[test])
+        np.save(os.path.join(tmp_path, f'{i}_y_test.npy'), y[test])
+    os.replace(tmp_path, path)
+    return path
+
+
+def _load_fold(path, fold):
+    return [
+        np.load(os.path.join(path, f'{fold}_{name}.npy'), mmap_mode='r')
+        for name in ('X_train', 'y_train', 'X_test', 'y_test')
+    ]
+
+
+def _evaluate(task):
+    name, params, cache_path, fold = task
+    X_train, y_train, X_test, y_test = _load_fold(cache_path, fold)
+    estimator, defaults = ESTIMATORS[name]
+    model = estimator(**{**defaults, **params})
+
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_pred = model.predict(X_test)
+    batch_seconds = time.perf_counter() - start
+
+    engine = CompiledForest.from_estimator(model)
+    row = np.ascontiguousarray(X_test[:1])
+    engine.predict(row)
+    start = time.perf_counter()
+    for _ in range(LATENCY_CALLS):
+        engine.predict(row)
+    single_seconds = (time.perf_counter() - start) / LATENCY_CALLS
+
+    return {
+        'model': name,
+        'params': params,
+        'fold': fold,
+        'mae': float(np.mean(np.abs(y_pred - y_test))),
+        'fit_seconds': fit_seconds,
+        'batch_us_per_row': batch_seconds / len(X_test) * 1e6,
+        'single_row_ms': single_seconds * 1e3,
+        'nodes': int(len(engine.feature))
+    }
+
+
+def candidates(grid=None):
+    grid = PARAM_GRID if grid is None else grid
+    return [(name, params) for name, space in grid.items() for params in ParameterGrid(space)]
+
+
+def leaderboard(results):
+    by_candidate = {}
+    for result in results:
+        key = (result['model'], json.dumps(result['params'], sort_keys=True))
+        by_candidate.setdefault(key, []).append(result)
+
+    board = []
+    for (name, _), folds in by_candidate.items():
+        maes = [f['mae'] for f in folds]
+        board.append({
+            'model': name,
+            'params': folds[0]['params'],
+            'mae': float(np.mean(maes)),
+            'mae_std': float(np.std(maes)),
+            'fold_mae': [f['mae'] for f in sorted(folds, key=lambda f: f['fold'])],
+            'fit_seconds': float(np.mean([f['fit_seconds'] for f in folds])),
+            'batch_us_per_row': float(np.mean([f['batch_us_per_row'] for f in folds])),
+            'single_row_ms': float(np.median([f['single_row_ms'] for f in folds])),
+            'nodes': int(np.mean([f['nodes'] for f in folds]))
+        })
+
+    # Pareto front on accuracy vs serving latency: nothing else is both more
+    # accurate and faster.
+    for entry in board:
+        entry['pareto'] = not any(
+            other['mae'] <= entry['mae'] and other['single_row_ms'] <= entry['single_row_ms']
+            and (other['mae'] < entry['mae'] or other['single_row_ms'] < entry['single_row_ms'])
+            for other in board
+        )
+    board.sort(key=lambda entry: entry['mae'])
+    return board
+
+
+def run_selection(data, grid=None, n_splits=4, max_workers=None, output=LEADERBOARD_PATH,
+                  cache_root=SELECTION_DIR):
+    X, y, _, _ = prepare_features(data)
+    folds = time_folds(data, n_splits)
+    cache_path = cache_folds(X, y, folds, cache_root)
+
+    tasks = [(name, params, cache_path, fold) for name, params in candidates(grid) for fold in range(len(folds))]
+    max_workers = max_workers or os.cpu_count() or 1
+    print(f"Evaluating {len(tasks) // len(folds)} candidates x {len(folds)} time folds "
+          f"on {len(X)} rows with {max_workers} worker(s)...")
+
+    start = time.perf_counter()
+    if max_workers == 1:
+        results = [_evaluate(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 mp_context=multiprocessing.get_context('spawn')) as pool:
+            results = list(pool.map(_evaluate, tasks))
+    elapsed = time.perf_counter() - start
+
+    board = leaderboard(results)
+    report = {
+        'created_at': time.time(),
+        'rows': int(len(X)),
+        'features': list(X.columns),
+        'folds': [
+            {'train_rows': int(len(train)), 'test_rows': int(len(test)), 'test_rounds': test_rounds}
+            for train, test, test_rounds in folds
+        ],
+        'seconds': elapsed,
+        'leaderboard': board
+    }
+    if output:
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=1)
+
+    print(f"{'model':<18} {'params':<52} {'MAE':>6} {'fit s':>7} {'row ms':>7}")
+    for entry in board:
+        params = ', '.join(f"{k}={v}" for k, v in sorted(entry['params'].items()))
+        print(f"{entry['model']:<18} {params:<52} {entry['mae']:6.3f} {entry['fit_seconds']:7.2f} "
+              f"{entry['single_row_ms']:7.3f}{' *' if entry['pareto'] else ''}")
+    print(f"* accuracy/latency Pareto front. {elapsed:.1f}s total"
+          + (f"; leaderboard written to {output}" if output else ""))
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time-aware cross-validated model selection")
+    parser.add_argument('--start-year', type=int, default=2025)
+    parser.add_argument('--end-year', type=int, default=2025)
+    parser.add_argument('--folds', type=int, default=4)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--output', default=LEADERBOARD_PATH)
+    args = parser.parse_args()
+
+    collector = F1DataCollector()
+    raw_data = collector.collect_historical_data(
+        start_year=args.start_year, end_year=args.end_year, columns=FEATURE_SOURCE_COLUMNS
+    )
+    run_selection(
+        collector.engineer_features(raw_data), n_splits=args.folds,
+        max_workers=args.workers, output=args.output
+    )
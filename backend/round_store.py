@@ -0,0 +1,173 @@
+import json
+import os
+import time
+import pandas as pd
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.fs as pafs
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Compact on-disk types for training rows. Columns not listed keep their dtype.
+COLUMN_TYPES = {
+    'year': 'int16',
+    'round': 'int8',
+    'event_name': 'category',
+    'driver': 'category',
+    'driver_number': 'int16',
+    'team': 'category',
+    'grid_position': 'int8',
+    'finish_position': 'int8',
+    'points': 'float32',
+    'status': 'category',
+    'q1_time': 'float32',
+    'q2_time': 'float32',
+    'q3_time': 'float32',
+    'laps_completed': 'int16',
+    'clean_laps': 'int16',
+    'pit_stops': 'int8',
+    'race_pace': 'float32',
+    'pace_delta': 'float32',
+    'pace_std': 'float32',
+    'degradation': 'float32',
+}
+
+
+def to_typed_frame(df):
+    return df.astype({col: dtype for col, dtype in COLUMN_TYPES.items() if col in df.columns})
+
+
+# Training rows partitioned on disk by (year, round), tracked in manifest.json.
+# Partitions are Parquet when pyarrow is installed (column-projected,
+# memory-mapped reads) and pickle otherwise.
+class RoundStore:
+    def __init__(self, root, format=None):
+        if format is None:
+            format = 'parquet' if pq is not None else 'pickle'
+        if format == 'parquet' and pq is None:
+            raise ImportError("pyarrow is required for the parquet training-data format")
+        
+        self.root = root
+        self.format = format
+        self.manifest_path = os.path.join(root, 'manifest.json')
+        os.makedirs(root, exist_ok=True)
+        self._manifest = self._read_manifest()
+
+    @staticmethod
+    def _key(year, round_num):
+        return f"{int(year)}-{int(round_num):02d}"
+
+    def _read_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path) as f:
+            return json.load(f)
+
+    def _write_manifest(self):
+        tmp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _partition_path(self, year, round_num):
+        extension = 'parquet' if self.format == 'parquet' else 'pkl'
+        return os.path.join(self.root, str(int(year)), f"{int(round_num):02d}.{extension}")
+
+    def rounds(self, start_year=None, end_year=None):
+        entries = sorted(self._manifest.values(), key=lambda e: (e['year'], e['round']))
+        return [
+            (e['year'], e['round']) for e in entries
+            if (start_year is None or e['year'] >= start_year)
+            and (end_year is None or e['year'] <= end_year)
+        ]
+
+    def is_current(self, year, round_num, fingerprint=None):
+        entry = self._manifest.get(self._key(year, round_num))
+        if entry is None:
+            return False
+        # Rounds imported without schedule metadata are trusted as-is.
+        return entry.get('fingerprint') is None or fingerprint is None or entry['fingerprint'] == fingerprint
+
+    def write(self, year, round_num, df, fingerprint=None):
+        path = self._partition_path(year, round_num)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        df = to_typed_frame(df.reset_index(drop=True))
+        if self.format == 'parquet':
+            pq.write_table(self._to_arrow(df), tmp_path)
+        else:
+            df.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+
+        previous = self._manifest.get(self._key(year, round_num))
+        if previous and previous['path'] != os.path.relpath(path, self.root):
+            stale_path = os.path.join(self.root, previous['path'])
+            if os.path.exists(stale_path):
+                os.remove(stale_path)
+
+        self._manifest[self._key(year, round_num)] = {
+            'year': int(year),
+            'round': int(round_num),
+            'rows': len(df),
+            'fingerprint': fingerprint,
+            'path': os.path.relpath(path, self.root),
+            'written_at': time.time()
+        }
+        self._write_manifest()
+
+    def import_frame(self, df):
+        imported = 0
+        for (year, round_num), part in df.groupby(['year', 'round'], sort=True):
+            if not self.is_current(year, round_num):
+                self.write(year, round_num, part)
+                imported += 1
+        return imported
+
+    @staticmethod
+    def _to_arrow(df):
+        # Fixed int32 dictionary indices keep partition schemas concatenable.
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        for i, field in enumerate(table.schema):
+            if pa.types.is_dictionary(field.type):
+                table = table.set_column(
+                    i, field.name, table.column(i).cast(pa.dictionary(pa.int32(), field.type.value_type))
+                )
+        return table
+
+    def _paths(self, start_year=None, end_year=None):
+        return [
+            os.path.join(self.root, self._manifest[self._key(year, round_num)]['path'])
+            for year, round_num in self.rounds(start_year, end_year)
+        ]
+
+    @staticmethod
+    def _read_path(path, columns=None):
+        if path.endswith('.parquet'):
+            return pq.read_table(path, columns=columns, memory_map=True)
+        df = pd.read_pickle(path)
+        return df[[col for col in columns if col in df.columns]] if columns is not None else df
+
+    def read(self, year, round_num, columns=None):
+        entry = self._manifest[self._key(year, round_num)]
+        part = self._read_path(os.path.join(self.root, entry['path']), columns)
+        return part.to_pandas() if pa is not None and isinstance(part, pa.Table) else part
+
+    def load(self, start_year, end_year, columns=None):
+        paths = self._paths(start_year, end_year)
+        if not paths:
+            return pd.DataFrame()
+        
+        if pq is not None and all(path.endswith('.parquet') for path in paths):
+            # One memory-mapped, column-projected scan over every partition;
+            # categorical dictionaries are unified when converting to pandas.
+            dataset = ds.dataset(
+                paths, format='parquet', filesystem=pafs.LocalFileSystem(use_mmap=True)
+            )
+            return dataset.to_table(columns=columns).to_pandas()
+        
+        parts = [self._read_path(path, columns) for path in paths]
+        parts = [part.to_pandas() if pa is not None and isinstance(part, pa.Table) else part for part in parts]
+        return to_typed_frame(pd.concat(parts, ignore_index=True))
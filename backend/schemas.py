@@ -1,6 +1,9 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional, Dict
 
+# A grid is at most ~20-26 cars; anything far beyond that is not a race.
+MAX_ENTRIES = 40
+
 class Driver(BaseModel):
     driver_id: str
     code: str
@@ -38,6 +41,64 @@ class PredictionOutput(BaseModel):
     podium_probability: float
     confidence: float
 
+class GridPredictionInput(BaseModel):
+    entries: List[PredictionInput] = Field(..., max_length=MAX_ENTRIES)
+
+class GridDriverPrediction(PredictionOutput):
+    field_win_probability: float
+    field_podium_probability: float
+
+class GridPredictionOutput(BaseModel):
+    predictions: List[GridDriverPrediction]
+
+class SimulationEntry(PredictionInput):
+    current_points: float = 0.0
+
+class RaceSimulationInput(BaseModel):
+    entries: List[SimulationEntry] = Field(..., max_length=MAX_ENTRIES)
+    n_simulations: int = 10000
+    seed: Optional[int] = None
+
+class DriverSimulation(BaseModel):
+    driver_id: str
+    win_probability: float
+    podium_probability: float
+    points_probability: float
+    dnf_probability: float
+    expected_position: float
+    position_distribution: List[float]
+    expected_points: float
+    points_std: float
+    points_distribution: Dict[str, float]
+    expected_championship_points: float
+
+class RaceSimulationOutput(BaseModel):
+    n_simulations: int
+    drivers: List[DriverSimulation]
+
+class ProjectedRound(BaseModel):
+    round: int
+    race_name: str
+
+class DriverProjection(BaseModel):
+    driver: str
+    team: str
+    current_points: float
+    wins: int
+    expected_points: float
+    points_p10: float
+    points_p50: float
+    points_p90: float
+    title_probability: float
+    expected_position: float
+
+class ChampionshipProjection(BaseModel):
+    season: int
+    model_version: str
+    n_simulations: int
+    completed_rounds: int
+    remaining_rounds: List[ProjectedRound]
+    drivers: List[DriverProjection]
 
 class RaceSchedule(BaseModel):
     round: int
@@ -59,3 +120,14 @@ class StandingsResponse(BaseModel):
     round: int
     season: int
     standings: List[DriverStanding]
+
+class TrainingJobStatus(BaseModel):
+    job_id: str
+    status: str
+    mode: Optional[str] = None
+    submitted_at: float
+    finished_at: Optional[float] = None
+    model_version: Optional[str] = None
+    metrics: Optional[Dict[str, float]] = None
+    stage_seconds: Optional[Dict[str, float]] = None
+    error: Optional[str] = None
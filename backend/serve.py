@@ -0,0 +1,67 @@
+import argparse
+import os
+import socket
+import sys
+import uvicorn
+from uvicorn.protocols.http.auto import AutoHTTPProtocol
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend import model
+from backend.artifacts import is_artifact, save_artifact
+
+
+class NoDelayHTTPProtocol(AutoHTTPProtocol):
+    # Multi-worker uvicorn hands workers a listening socket rebuilt from its
+    # fd, which asyncio no longer recognises as TCP, so TCP_NODELAY is never
+    # set. Headers and body then go out as two segments and every response
+    # stalls ~40ms on the client's delayed ACK.
+    def connection_made(self, transport):
+        sock = transport.get_extra_info('socket')
+        if sock is not None:
+            try:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            except OSError:
+                pass
+        super().connection_made(transport)
+
+
+def prepare_shared_model():
+    # Workers memory-map the compact artifact, so the forests live once in the
+    # page cache no matter how many workers run. A legacy pickle would be
+    # unpickled into private memory by every worker, so convert it first.
+    path = model.current_model_path()
+    if is_artifact(path) or not os.path.exists(path):
+        return path
+
+    predictor = model.RacePredictor(model_path=path)
+    if not predictor._ensure_loaded():
+        return path
+
+    converted = os.path.join(model.ARTIFACT_DIR, os.path.splitext(os.path.basename(path))[0])
+    print(f"Converting {path} to a shared artifact at {converted}...")
+    save_artifact(predictor, converted)
+    model.publish_model(converted)
+    return converted
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the F1 Predictor API with multiple workers")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    path = prepare_shared_model()
+    print(f"Serving model {path} with {args.workers} worker(s)")
+    uvicorn.run(
+        "backend.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        http='backend.serve:NoDelayHTTPProtocol',
+        log_level='warning'
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import numpy as np
+
+POINTS = np.array([25, 18, 15, 12, 10, 8, 6, 4, 2, 1], dtype=np.float64)
+DEFAULT_FINISH_RATE = 0.9
+DEFAULT_SIMULATIONS = 10000
+
+
+def points_table(n_drivers):
+    # Points by finishing position (index 0 = P1) for an n-car field.
+    table = np.zeros(n_drivers, dtype=np.float64)
+    scored = min(n_drivers, len(POINTS))
+    table[:scored] = POINTS[:scored]
+    return table
+
+
+def finish_rates(predictor, drivers):
+    # Per-driver probability of reaching the flag, from the share of their
+    # training races flagged `finished` by engineer_features. Drivers the
+    # model doesn't know (or models trained before finish_rate was recorded)
+    # get the field average.
+    stats = predictor.driver_stats
+    known = [s['finish_rate'] for s in stats.values() if 'finish_rate' in s]
+    default = float(np.mean(known)) if known else DEFAULT_FINISH_RATE
+    return np.array([
+        float(stats.get(driver, {}).get('finish_rate', default)) if driver else default
+        for driver in drivers
+    ])
+
+
+def sample_finishing_orders(position_samples, finish_rate, n_sims, rng):
+    # position_samples: (drivers, trees) per-tree predicted positions.
+    # Each simulated race draws one tree per driver, sends drivers who fail
+    # their finish roll to the back, and ranks the rest by the drawn position
+    # (random tie-break). Returns (positions, dnf), both (n_sims, drivers),
+    # positions 1-based.
+    n_drivers, n_trees = position_samples.shape
+    tree = rng.integers(n_trees, size=(n_sims, n_drivers))
+    score = position_samples[np.arange(n_drivers), tree]
+    score += rng.random((n_sims, n_drivers)) * 1e-3
+
+    dnf = rng.random((n_sims, n_drivers)) >= finish_rate
+    score[dnf] += 1e6
+
+    order = np.argsort(score, axis=1)
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.arange(1, n_drivers + 1), axis=1)
+    return positions, dnf
+
+
+def race_points(positions, dnf):
+    points = points_table(positions.shape[1])[positions - 1]
+    points[dnf] = 0.0
+    return points
+
+
+def simulate_outcomes(predictor, entries, n_sims=DEFAULT_SIMULATIONS, seed=None):
+    # (positions, dnf, points), each (n_sims, len(entries)) in entry order.
+    rng = np.random.default_rng(seed)
+    samples, drivers = predictor.position_samples(entries)
+    positions, dnf = sample_finishing_orders(samples, finish_rates(predictor, drivers), n_sims, rng)
+    return positions, dnf, race_points(positions, dnf)
+
+
+def simulate_race(predictor, entries, n_sims=DEFAULT_SIMULATIONS, seed=None):
+    # entries: [{'driver', 'team', 'grid', optional 'current_points'}]
+    # Results keep input order.
+    if not entries:
+        return []
+
+    positions, dnf, points = simulate_outcomes(predictor, entries, n_sims, seed)
+
+    n_drivers = len(entries)
+    # position_counts[d, p] = races where driver d finished in position p + 1
+    position_counts = np.bincount(
+        (np.arange(n_drivers) * n_drivers + positions - 1).ravel(), minlength=n_drivers * n_drivers
+    ).reshape(n_drivers, n_drivers)
+    position_probs = position_counts / n_sims
+
+    results = []
+    for d, entry in enumerate(entries):
+        values, counts = np.unique(points[:, d], return_counts=True)
+        expected_points = float(points[:, d].mean())
+        classified = ~dnf[:, d]
+        results.append({
+            'win_probability': round(float(((positions[:, d] == 1) & classified).mean()), 4),
+            'podium_probability': round(float(((positions[:, d] <= 3) & classified).mean()), 4),
+            'points_probability': round(float((points[:, d] > 0).mean()), 4),
+            'dnf_probability': round(float(dnf[:, d].mean()), 4),
+            'expected_position': round(float(positions[:, d].mean()), 3),
+            'position_distribution': [round(float(p), 4) for p in position_probs[d]],
+            'expected_points': round(expected_points, 3),
+            'points_std': round(float(points[:, d].std()), 3),
+            'points_distribution': {
+                f'{value:g}': round(float(count) / n_sims, 4) for value, count in zip(values, counts)
+            },
+            'expected_championship_points': round(
+                float(entry.get('current_points') or 0.0) + expected_points, 3
+            )
+        })
+    return results
@@ -0,0 +1,159 @@
+from collections.abc import Mapping
+import numpy as np
+
+
+def _group_mean(codes, values, n):
+    # Per-code mean ignoring NaNs, like pandas .mean().
+    values = np.asarray(values, dtype=np.float64)
+    present = ~np.isnan(values)
+    totals = np.bincount(codes, weights=np.where(present, values, 0.0), minlength=n)
+    counts = np.bincount(codes, weights=present, minlength=n)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return totals / counts
+
+
+def _first_and_last(codes, n):
+    # Row index of each code's first and last occurrence.
+    _, first = np.unique(codes, return_index=True)
+    _, last_reversed = np.unique(codes[::-1], return_index=True)
+    present = np.unique(codes)
+    first_row = np.full(n, -1, dtype=np.int64)
+    last_row = np.full(n, -1, dtype=np.int64)
+    first_row[present] = first
+    last_row[present] = len(codes) - 1 - last_reversed
+    return first_row, last_row
+
+
+# Per-entity statistics stored column-wise, one row per encoder code, so the
+# predict path reads stats[column][code] directly. It is also a read-only
+# Mapping of name -> {column: value}, iterated in first-seen order like the
+# dicts it replaces, so name-based callers keep working.
+class StatsIndex(Mapping):
+    def __init__(self, names, columns, order=None):
+        self.names = np.asarray(names, dtype=object)
+        self.codes = {name: i for i, name in enumerate(self.names)}
+        self.columns = columns
+        self.order = np.arange(len(self.names)) if order is None else np.asarray(order)
+        self._present = set(int(code) for code in self.order)
+
+    @classmethod
+    def from_rows(cls, classes, codes, frame, aggregations, derived=None):
+        # One grouped pass over the training rows (codes are the encoded ids,
+        # row-aligned with frame). aggregations maps column -> (kind, source),
+        # kind in mean / count / count_if / last; sources are looked up in
+        # derived first, then frame. A missing mean source gives 1.0.
+        n = len(classes)
+        codes = np.asarray(codes, dtype=np.int64)
+        derived = derived or {}
+        first_row, last_row = _first_and_last(codes, n)
+
+        def source_values(source, dtype):
+            if source in derived:
+                return np.asarray(derived[source], dtype=dtype)
+            return frame[source].to_numpy(dtype=dtype) if source in frame else None
+
+        columns = {}
+        for column, (kind, source) in aggregations.items():
+            if kind == 'count':
+                columns[column] = np.bincount(codes, minlength=n).astype(np.int64)
+            elif kind == 'count_if':
+                columns[column] = np.bincount(
+                    codes, weights=source_values(source, np.float64), minlength=n
+                ).astype(np.int64)
+            elif kind == 'mean':
+                values = source_values(source, np.float64)
+                columns[column] = _group_mean(codes, values, n) if values is not None else np.ones(n)
+            elif kind == 'last':
+                values = source_values(source, object)
+                columns[column] = np.where(last_row >= 0, values[np.maximum(last_row, 0)], None)
+            else:
+                raise ValueError(f"Unknown aggregation {kind!r} for {column}")
+
+        seen = np.flatnonzero(first_row >= 0)
+        order = seen[np.argsort(first_row[seen], kind='stable')]
+        return cls(classes, columns, order)
+
+    @classmethod
+    def from_mapping(cls, stats, classes=None):
+        # From {name: {column: value}} (older artifacts), aligned to the
+        # encoder classes when given.
+        if isinstance(stats, StatsIndex) and classes is None:
+            return stats
+        names = list(classes) if classes is not None else list(stats)
+        names += [name for name in stats if name not in set(names)]
+        code = {name: i for i, name in enumerate(names)}
+        column_names = []
+        for row in stats.values():
+            column_names.extend(c for c in row if c not in column_names)
+
+        columns = {}
+        for column in column_names:
+            values = [stats[name].get(column) if name in stats else None for name in names]
+            if all(isinstance(v, (int, np.integer)) or v is None for v in values) and any(v is not None for v in values):
+                columns[column] = np.array([v if v is not None else 0 for v in values], dtype=np.int64)
+            elif all(isinstance(v, (int, float, np.number)) or v is None for v in values):
+                columns[column] = np.array([v if v is not None else np.nan for v in values], dtype=np.float64)
+            else:
+                columns[column] = np.array(values, dtype=object)
+        return cls(names, columns, [code[name] for name in stats])
+
+    def value(self, name, column, default=None):
+        code = self.codes.get(name)
+        if code is None or column not in self.columns:
+            return default
+        return self._item(self.columns[column][code])
+
+    @staticmethod
+    def _item(value):
+        return value.item() if isinstance(value, np.generic) else value
+
+    def row(self, code):
+        return {column: self._item(values[code]) for column, values in self.columns.items()}
+
+    def to_dict(self):
+        return {name: self[name] for name in self}
+
+    def __getitem__(self, name):
+        code = self.codes.get(name)
+        if code is None or code not in self._present:
+            raise KeyError(name)
+        return self.row(code)
+
+    def __contains__(self, name):
+        code = self.codes.get(name)
+        return code is not None and code in self._present
+
+    def __iter__(self):
+        return (self.names[code] for code in self.order)
+
+    def __len__(self):
+        return len(self.order)
+
+
+DRIVER_AGGREGATIONS = {
+    'avg_finish': ('mean', 'finish_position'),
+    'avg_grid': ('mean', 'grid_position'),
+    'wins': ('count_if', 'won'),
+    'podiums': ('count_if', 'podium'),
+    'total_races': ('count', None),
+    'avg_points': ('mean', 'points'),
+    'finish_rate': ('mean', 'finished'),
+    'team': ('last', 'team'),
+}
+
+TEAM_AGGREGATIONS = {
+    'avg_finish': ('mean', 'finish_position'),
+    'wins': ('count_if', 'won'),
+    'total_races': ('count', None),
+}
+
+
+def build_stats(data, driver_classes, driver_codes, team_classes, team_codes):
+    # driver_stats / team_stats for training rows whose driver and team are
+    # already encoded; cost is linear in rows whatever the number of drivers.
+    finish = data['finish_position'].to_numpy()
+    derived = {'won': finish == 1, 'podium': finish <= 3}
+    return (
+        StatsIndex.from_rows(driver_classes, driver_codes, data, DRIVER_AGGREGATIONS, derived),
+        StatsIndex.from_rows(team_classes, team_codes, data, TEAM_AGGREGATIONS, derived)
+    )
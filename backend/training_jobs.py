@@ -0,0 +1,159 @@
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from . import model
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# The one-job-at-a-time check in submit() is per process; this lock file
+# keeps several uvicorn workers from training and publishing CURRENT at the
+# same time. Without fcntl (Windows) only a single worker may take training
+# requests.
+TRAINING_LOCK_PATH = os.path.join(model.ARTIFACT_DIR, '.training.lock')
+
+
+def _acquire_training_lock():
+    # Held by the serving process from submit until the new model is
+    # published, so the artifact is checked before CURRENT moves. Returns the
+    # open lock file (None without fcntl); raises if another worker holds it.
+    if fcntl is None:
+        return None
+    os.makedirs(os.path.dirname(TRAINING_LOCK_PATH), exist_ok=True)
+    f = open(TRAINING_LOCK_PATH, 'a')
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        f.close()
+        raise RuntimeError("Another worker is already running a training job") from None
+    return f
+
+
+def _release_training_lock(lock):
+    if lock is not None:
+        fcntl.flock(lock, fcntl.LOCK_UN)
+        lock.close()
+
+
+def _run_training_job(incremental=False):
+    # Runs in the worker process: keep the API processes ahead of training for CPU.
+    # Only saves the artifact; the serving process checks and publishes it.
+    try:
+        os.nice(10)
+    except (AttributeError, OSError):
+        pass
+
+    scores = model.train_model_from_data(publish=False, incremental=incremental)
+    unchanged = scores['mode'] == 'unchanged'
+    return {
+        'mode': scores['mode'],
+        'mae': None if unchanged else float(scores['mae']),
+        'rmse': None if unchanged else float(scores['rmse']),
+        'stage_seconds': {stage: float(seconds) for stage, seconds in scores['stage_seconds'].items()},
+        'version': scores['version'],
+        'model_path': scores['model_path']
+    }
+
+
+class TrainingJobs:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._active_job_id = None
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._executor
+
+    def submit(self, incremental=False):
+        with self._lock:
+            active = self._jobs.get(self._active_job_id)
+            if active and active['status'] == 'running':
+                return dict(active)
+
+            job_id = uuid.uuid4().hex[:12]
+            job = {
+                'job_id': job_id,
+                'status': 'running',
+                'mode': 'incremental' if incremental else 'full',
+                'submitted_at': time.time(),
+                'finished_at': None,
+                'model_version': None,
+                'metrics': None,
+                'stage_seconds': None,
+                'error': None
+            }
+            self._jobs[job_id] = job
+            self._active_job_id = job_id
+
+            try:
+                lock = _acquire_training_lock()
+            except RuntimeError as e:
+                job.update(status='failed', error=str(e), finished_at=time.time())
+                return dict(job)
+
+            try:
+                future = self._get_executor().submit(_run_training_job, incremental)
+            except BaseException:
+                _release_training_lock(lock)
+                raise
+            future.add_done_callback(lambda f: self._finish(job_id, f, lock))
+            return dict(job)
+
+    def _finish(self, job_id, future, lock=None):
+        try:
+            result = future.result()
+
+            # Load and warm the new artifact off the request path; only a model
+            # that loads is published to CURRENT and swapped in.
+            if result['mode'] != 'unchanged':
+                new_predictor = model.RacePredictor(model_path=result['model_path'])
+                if not new_predictor.load():
+                    raise RuntimeError(f"Trained artifact {result['model_path']} could not be loaded")
+                model.publish_model(new_predictor.model_path)
+                model.swap_predictor(new_predictor)
+
+            update = {
+                'status': 'succeeded',
+                'mode': result['mode'],
+                'model_version': result['version'],
+                'metrics': None if result['mode'] == 'unchanged' else {'mae': result['mae'], 'rmse': result['rmse']},
+                'stage_seconds': result['stage_seconds']
+            }
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                with self._lock:
+                    self._executor = None
+            print(f"Training job {job_id} failed: {e}")
+            update = {'status': 'failed', 'error': str(e)}
+        finally:
+            _release_training_lock(lock)
+
+        with self._lock:
+            self._jobs[job_id].update(update, finished_at=time.time())
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def shutdown(self):
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+jobs = TrainingJobs()
@@ -0,0 +1,36 @@
+import sys
+import os
+import tempfile
+import time
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.data_collector import F1DataCollector
+from benchmarks.synthetic import SyntheticSessionProvider
+
+
+def collect(provider, max_workers):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        collector = F1DataCollector(cache_dir=cache_dir, session_provider=provider, retry_backoff=0.01)
+        start = time.perf_counter()
+        df = collector.collect_historical_data(2025, 2026, max_workers=max_workers)
+        return df, time.perf_counter() - start
+
+
+def main(latency=0.05):
+    # Two stubbed seasons where every session load takes `latency` seconds and
+    # fails once before succeeding, to exercise retry/backoff.
+    baseline = None
+    for workers in (1, 4, 8, 16):
+        provider = SyntheticSessionProvider(seasons=2, latency=latency, failures_per_session=1)
+        df, elapsed = collect(provider, workers)
+        if baseline is None:
+            baseline = (df, elapsed)
+        else:
+            pd.testing.assert_frame_equal(df, baseline[0])
+        print(f"workers={workers:>2}: {len(df)} rows, {provider.session_loads} get_session calls, "
+              f"{elapsed:6.2f}s ({baseline[1] / elapsed:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
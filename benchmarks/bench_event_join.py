@@ -0,0 +1,82 @@
+import sys
+import os
+import time
+import warnings
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.data_collector import F1DataCollector
+from backend.round_store import to_typed_frame
+from benchmarks.synthetic import SyntheticSessionProvider
+
+warnings.filterwarnings('ignore')
+
+
+def legacy_event_rows(year, round_num, event_name, quali_results, race_results):
+    # The per-row qualifying scan _event_rows used to run.
+    rows = []
+    for i, race_row in race_results.iterrows():
+        driver_abbr = race_row['Abbreviation']
+        quali_row = quali_results[quali_results['Abbreviation'] == driver_abbr]
+        if quali_row.empty:
+            continue
+        quali_row = quali_row.iloc[0]
+        grid_pos = race_row['GridPosition']
+        finish_pos = race_row['Position']
+        if pd.isna(grid_pos) or pd.isna(finish_pos):
+            continue
+        rows.append({
+            'year': year,
+            'round': round_num,
+            'event_name': event_name,
+            'driver': str(driver_abbr),
+            'driver_number': int(race_row['DriverNumber']) if pd.notna(race_row['DriverNumber']) else 0,
+            'team': str(race_row['TeamName']),
+            'grid_position': int(grid_pos),
+            'finish_position': int(finish_pos),
+            'points': float(race_row['Points']) if pd.notna(race_row['Points']) else 0.0,
+            'status': str(race_row['Status']) if pd.notna(race_row['Status']) else 'Unknown',
+            'q1_time': quali_row['Q1'].total_seconds() if pd.notna(quali_row['Q1']) else None,
+            'q2_time': quali_row['Q2'].total_seconds() if pd.notna(quali_row['Q2']) else None,
+            'q3_time': quali_row['Q3'].total_seconds() if pd.notna(quali_row['Q3']) else None,
+        })
+    return rows
+
+
+def best_of(fn, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    # Entry lists far beyond a real grid make the drivers^2 scan visible.
+    for drivers in (20, 100, 400, 1600):
+        provider = SyntheticSessionProvider(seasons=1, rounds=1, drivers=drivers)
+        quali = provider.get_session(2025, 1, 'Q')
+        race = provider.get_session(2025, 1, 'R')
+        quali.load(laps=False)
+        race.load(laps=False)
+        # A retirement without a classified position and a driver who didn't
+        # qualify, both of which must be dropped.
+        race_results = race.results.copy()
+        race_results.loc[0, 'Position'] = float('nan')
+        quali_results = quali.results[quali.results['Abbreviation'] != race_results['Abbreviation'].iloc[1]]
+        repeats = 5 if drivers <= 400 else 1
+
+        legacy, legacy_s = best_of(lambda: legacy_event_rows(
+            2025, 1, 'Grand Prix 1', quali_results, race_results), repeats)
+        merged, merged_s = best_of(lambda: F1DataCollector._event_rows(
+            2025, 1, 'Grand Prix 1', quali_results, race_results), repeats)
+
+        pd.testing.assert_frame_equal(to_typed_frame(merged), to_typed_frame(pd.DataFrame(legacy)))
+        print(f"{drivers:>5} drivers: per-row scan {legacy_s * 1e3:8.1f} ms "
+              f"({legacy_s / drivers * 1e6:6.0f} us/driver), keyed merge {merged_s * 1e3:5.1f} ms "
+              f"({merged_s / drivers * 1e6:5.1f} us/driver), {legacy_s / merged_s:6.1f}x, identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import sys
+import os
+import contextlib
+import io
+import tempfile
+import time
+import warnings
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.data_collector import F1DataCollector
+from backend.model import RacePredictor
+from benchmarks.synthetic import synthetic_race_data
+
+warnings.filterwarnings('ignore')
+
+
+def forward_mae(predictor, rows):
+    # Error on a round the model hasn't seen, over drivers and teams it knows.
+    driver_codes = {d: i for i, d in enumerate(predictor.le_driver.classes_)}
+    team_codes = {t: i for i, t in enumerate(predictor.le_team.classes_)}
+    known = rows['driver'].isin(driver_codes) & rows['team'].isin(team_codes)
+    rows = rows[known]
+    X, y = predictor._feature_matrix(rows, rows['driver'].map(driver_codes), rows['team'].map(team_codes))
+    return float(np.mean(np.abs(predictor.position_model.predict(X) - y)))
+
+
+def quiet(fn, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args)
+
+
+def main(seasons=5, new_rounds=6):
+    collector = F1DataCollector.__new__(F1DataCollector)
+    data = collector.engineer_features(synthetic_race_data(seasons=seasons))
+    last_year = data['year'].max()
+    key = data['year'] * 100 + data['round']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        incremental = RacePredictor(model_path=os.path.join(tmp, 'incremental_0'))
+        quiet(incremental.train, data[key <= last_year * 100])
+
+        full_total = incremental_total = 0.0
+        full_errors, incremental_errors = [], []
+        print(f"{seasons} seasons of history, then {new_rounds} new rounds one at a time")
+        for round_num in range(1, new_rounds + 1):
+            seen = data[key <= last_year * 100 + round_num]
+            next_round = data[key == last_year * 100 + round_num + 1]
+
+            full = RacePredictor(model_path=os.path.join(tmp, f'full_{round_num}'))
+            start = time.perf_counter()
+            quiet(full.train, seen)
+            full_s = time.perf_counter() - start
+
+            incremental.model_path = os.path.join(tmp, f'incremental_{round_num}')
+            start = time.perf_counter()
+            quiet(incremental.update, seen)
+            incremental_s = time.perf_counter() - start
+
+            full_errors.append(forward_mae(full, next_round))
+            incremental_errors.append(forward_mae(incremental, next_round))
+            full_total += full_s
+            incremental_total += incremental_s
+            print(f"round {round_num}: full retrain {full_s:5.2f}s (next-round MAE {full_errors[-1]:.2f}), "
+                  f"incremental {incremental_s:5.2f}s (next-round MAE {incremental_errors[-1]:.2f}), "
+                  f"{full_s / incremental_s:4.1f}x faster")
+
+        reloaded = RacePredictor(model_path=incremental.model_path)
+        assert quiet(reloaded.load) and reloaded.trained_rounds == incremental.trained_rounds
+        print(f"total: full {full_total:.2f}s, incremental {incremental_total:.2f}s "
+              f"({full_total / incremental_total:.1f}x); mean next-round MAE "
+              f"full {np.mean(full_errors):.3f}, incremental {np.mean(incremental_errors):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import sys
+import os
+import contextlib
+import io
+import tempfile
+import time
+import tracemalloc
+import warnings
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.data_collector import F1DataCollector
+from backend.lap_features import summarize_laps
+from benchmarks.synthetic import SyntheticSessionProvider
+
+warnings.filterwarnings('ignore')
+
+
+def hold_everything(provider, seasons):
+    # The naive alternative: keep every session's laps, then summarize.
+    tracemalloc.start()
+    all_laps = []
+    for year in range(2010, 2010 + seasons):
+        for round_num in provider.get_event_schedule(year)['RoundNumber']:
+            session = provider.get_session(year, int(round_num), 'R')
+            session.load()
+            all_laps.append(session.laps.assign(year=year, round=int(round_num)))
+    laps = pd.concat(all_laps, ignore_index=True)
+    summaries = [summarize_laps(part) for _, part in laps.groupby(['year', 'round'])]
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return len(summaries), peak / 2**20
+
+
+def main():
+    for seasons in (1, 3, 10):
+        provider = SyntheticSessionProvider(seasons=seasons, start_year=2010)
+        with tempfile.TemporaryDirectory() as tmp:
+            collector = F1DataCollector(cache_dir=tmp, session_provider=provider)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                reports = collector.collect_lap_summaries(2010, 2010 + seasons - 1, trace_memory=True)
+            streaming_s = time.perf_counter() - start
+            summary_mb = sum(
+                os.path.getsize(os.path.join(root, name))
+                for root, _, names in os.walk(collector.lap_store().root) for name in names
+            ) / 2**20
+
+        rounds, held_peak = hold_everything(provider, seasons)
+        assert rounds == len(reports)
+        print(f"{seasons:>2} season(s), {len(reports):>3} sessions, {sum(r['laps'] for r in reports):>6} laps: "
+              f"streaming peak {max(r['peak_mb'] for r in reports):5.1f} MB/session "
+              f"({streaming_s:5.1f}s, {summary_mb:4.2f} MB stored); holding all laps peaks at {held_peak:6.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
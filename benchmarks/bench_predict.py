@@ -0,0 +1,58 @@
+import sys
+import os
+import time
+import warnings
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.model import RacePredictor
+
+warnings.filterwarnings('ignore')
+
+
+def time_calls(predictor, cases, repeat):
+    latencies = []
+    results = []
+    for _ in range(repeat):
+        for driver, team, grid in cases:
+            start = time.perf_counter()
+            result = predictor.predict(driver, team, grid)
+            latencies.append(time.perf_counter() - start)
+            results.append(result)
+    latencies = np.array(latencies) * 1e3
+    return results, np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def main(repeat=3):
+    predictor = RacePredictor()
+    if not predictor._ensure_loaded():
+        print("No trained model found - run backend/train_model.py first.")
+        return 1
+    # Time the forests themselves, not prediction cache hits.
+    predictor.use_prediction_cache = False
+    
+    teams = list(predictor.team_stats.keys())
+    cases = [
+        (driver, teams[i % len(teams)], grid)
+        for i, driver in enumerate(predictor.driver_stats.keys())
+        for grid in (1, 5, 10, 20)
+    ]
+    
+    predictor.fast_path = False
+    reference, ref_p50, ref_p99 = time_calls(predictor, cases, repeat)
+    
+    predictor.fast_path = True
+    fast, fast_p50, fast_p99 = time_calls(predictor, cases, repeat)
+    
+    mismatches = sum(1 for a, b in zip(reference, fast) if a != b)
+    
+    print(f"Single-row predict over {len(cases) * repeat} calls")
+    print(f"  pandas path: p50 {ref_p50:.3f} ms, p99 {ref_p99:.3f} ms")
+    print(f"  fast path:   p50 {fast_p50:.3f} ms, p99 {fast_p99:.3f} ms")
+    print(f"  speedup:     p50 {ref_p50 / fast_p50:.1f}x, p99 {ref_p99 / fast_p99:.1f}x")
+    print(f"  mismatched results: {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+import sys
+import os
+import tempfile
+import time
+import warnings
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.data_collector import F1DataCollector
+from backend.model import RacePredictor
+from backend.simulation import simulate_race
+from benchmarks.synthetic import synthetic_race_data
+
+warnings.filterwarnings('ignore')
+
+
+def main(n_sims=10000, repeat=5):
+    collector = F1DataCollector.__new__(F1DataCollector)
+    data = collector.engineer_features(synthetic_race_data(seasons=2))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        predictor = RacePredictor(model_path=os.path.join(tmp, 'race_predictor_bench'))
+        predictor.train(data)
+
+        latest = data[data['year'] == data['year'].max()].drop_duplicates('driver')
+        entries = [
+            {'driver': row.driver, 'team': row.team, 'grid': i + 1}
+            for i, row in enumerate(latest.head(20).itertuples())
+        ]
+
+        for backend in ('sklearn', 'compiled'):
+            predictor.use_inference_backend(backend)
+            timings = []
+            for seed in range(repeat):
+                start = time.perf_counter()
+                results = simulate_race(predictor, entries, n_sims=n_sims, seed=seed)
+                timings.append(time.perf_counter() - start)
+
+            win_total = sum(r['win_probability'] for r in results)
+            print(f"{backend:>8}: {n_sims} races x {len(entries)} cars in "
+                  f"{np.median(timings) * 1e3:.1f} ms (median of {repeat}), win probabilities sum to {win_total:.3f}")
+
+        for entry, result in list(zip(entries, results))[:3]:
+            print(f"  P{entry['grid']} {entry['driver']}: win {result['win_probability']:.3f}, "
+                  f"podium {result['podium_probability']:.3f}, DNF {result['dnf_probability']:.3f}, "
+                  f"E[points] {result['expected_points']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import sys
+import os
+import time
+import warnings
+import numpy as np
+from sklearn.preprocessing import LabelEncoder
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.data_collector import F1DataCollector
+from backend.stats_index import build_stats
+from benchmarks.synthetic import synthetic_race_data
+
+warnings.filterwarnings('ignore')
+
+
+def legacy_stats(data):
+    # The per-driver / per-team DataFrame scans RacePredictor.train used to run.
+    driver_stats = {}
+    for driver in data['driver'].unique():
+        driver_data = data[data['driver'] == driver]
+        driver_stats[driver] = {
+            'avg_finish': driver_data['finish_position'].mean(),
+            'avg_grid': driver_data['grid_position'].mean(),
+            'wins': (driver_data['finish_position'] == 1).sum(),
+            'podiums': (driver_data['finish_position'] <= 3).sum(),
+            'total_races': len(driver_data),
+            'avg_points': driver_data['points'].mean(),
+            'finish_rate': driver_data['finished'].mean() if 'finished' in driver_data else 1.0,
+            'team': driver_data['team'].iloc[-1]
+        }
+
+    team_stats = {}
+    for team in data['team'].unique():
+        team_data = data[data['team'] == team]
+        team_stats[team] = {
+            'avg_finish': team_data['finish_position'].mean(),
+            'wins': (team_data['finish_position'] == 1).sum(),
+            'total_races': len(team_data)
+        }
+    return driver_stats, team_stats
+
+
+def same(expected, actual):
+    if list(expected) != list(actual):
+        return False
+    for name, row in expected.items():
+        other = actual[name]
+        for column, value in row.items():
+            if isinstance(value, str):
+                if other[column] != value:
+                    return False
+            elif not np.isclose(float(other[column]), float(value), rtol=1e-12, atol=0):
+                return False
+    return True
+
+
+def main():
+    collector = F1DataCollector.__new__(F1DataCollector)
+    for seasons, drivers in [(1, 20), (5, 20), (20, 20), (20, 60)]:
+        data = collector.engineer_features(synthetic_race_data(seasons=seasons, drivers=drivers))
+        le_driver, le_team = LabelEncoder(), LabelEncoder()
+        driver_codes = le_driver.fit_transform(data['driver'])
+        team_codes = le_team.fit_transform(data['team'])
+
+        start = time.perf_counter()
+        expected = legacy_stats(data)
+        legacy_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = build_stats(data, le_driver.classes_, driver_codes, le_team.classes_, team_codes)
+        index_s = time.perf_counter() - start
+
+        assert same(expected[0], actual[0]) and same(expected[1], actual[1]), (seasons, drivers)
+        print(f"{seasons:>2} seasons, {data['driver'].nunique():>3} drivers, {len(data):>6} rows: "
+              f"per-driver scans {legacy_s * 1e3:7.1f} ms, stats index {index_s * 1e3:6.1f} ms "
+              f"({legacy_s / index_s:5.1f}x), identical")
+
+
+if __name__ == "__main__":
+    main()
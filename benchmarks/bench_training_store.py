@@ -0,0 +1,81 @@
+import sys
+import os
+import json
+import subprocess
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from backend.data_collector import FEATURE_SOURCE_COLUMNS
+from backend.round_store import RoundStore
+from benchmarks.synthetic import synthetic_race_data
+
+# Each case runs in a fresh interpreter so RSS growth is attributable to it. Cold
+# numbers include one-off library initialisation (notably Arrow's allocator).
+LOAD_SCRIPT = '''
+import json, sys, time
+sys.path.insert(0, {root!r})
+from backend.round_store import RoundStore
+
+def rss_mb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+store = RoundStore({store_root!r}, format={format!r})
+before = rss_mb()
+start = time.perf_counter()
+df = store.load(None, None, columns={columns!r})
+cold = time.perf_counter() - start
+cold_rss = rss_mb() - before
+del df
+
+start = time.perf_counter()
+df = store.load(None, None, columns={columns!r})
+warm = time.perf_counter() - start
+print(json.dumps({{'cold_seconds': cold, 'warm_seconds': warm, 'rss_mb': cold_rss, 'rows': len(df),
+                  'frame_mb': df.memory_usage(deep=True).sum() / 2**20}}))
+'''
+
+
+def measure(store_root, format, columns):
+    script = LOAD_SCRIPT.format(root=ROOT, store_root=store_root, format=format, columns=columns)
+    out = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def disk_mb(path):
+    return sum(
+        os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files
+    ) / 2**20
+
+
+def main(seasons=20):
+    data = synthetic_race_data(seasons=seasons)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        roots = {}
+        for format in ('pickle', 'parquet'):
+            roots[format] = os.path.join(tmp, format)
+            RoundStore(roots[format], format=format).import_frame(data)
+        
+        print(f"{seasons} synthetic seasons, {len(data)} rows")
+        cases = [
+            ('pickle', None),
+            ('parquet', None),
+            ('pickle', FEATURE_SOURCE_COLUMNS),
+            ('parquet', FEATURE_SOURCE_COLUMNS),
+        ]
+        for format, columns in cases:
+            result = measure(roots[format], format, columns)
+            label = 'feature columns' if columns else 'all columns'
+            print(f"  {format:<8} {label:<16} cold {result['cold_seconds'] * 1e3:6.1f} ms, "
+                  f"warm {result['warm_seconds'] * 1e3:6.1f} ms, "
+                  f"RSS +{result['rss_mb']:5.1f} MB, frame {result['frame_mb']:5.2f} MB, "
+                  f"disk {disk_mb(roots[format]):5.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import sys
+import os
+import time
+import warnings
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.data_collector import F1DataCollector
+from backend.model import RacePredictor
+from backend.model_gradient_boosting import GradientBoostingPredictor
+from backend.tree_engine import CompiledForest
+from benchmarks.synthetic import synthetic_race_data
+
+warnings.filterwarnings('ignore')
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def compare(name, model, X, batch_sizes=(1, 20, 10000)):
+    engine = CompiledForest.from_estimator(model)
+    rng = np.random.default_rng(0)
+    
+    for size in batch_sizes:
+        batch = X.iloc[rng.integers(0, len(X), size)]
+        repeat = 20 if size < 1000 else 3
+        expected, sk_s = best_of(lambda: model.predict(batch), repeat)
+        actual, engine_s = best_of(lambda: engine.predict(batch), repeat)
+        
+        max_error = float(np.max(np.abs(expected - actual)))
+        assert np.allclose(expected, actual, rtol=1e-9, atol=1e-9), (name, size, max_error)
+        print(f"  {name:<16} batch {size:>5}: sklearn {sk_s * 1e3:8.2f} ms, compiled {engine_s * 1e3:8.2f} ms "
+              f"({sk_s / engine_s:5.1f}x), max |diff| {max_error:.1e}")
+
+
+def main(seasons=10):
+    collector = F1DataCollector.__new__(F1DataCollector)
+    data = collector.engineer_features(synthetic_race_data(seasons=seasons))
+    
+    for cls in (RacePredictor, GradientBoostingPredictor):
+        predictor = cls()
+        X, y = predictor.prepare_features(data)
+        predictor.position_model.fit(X, y)
+        X_win = X.copy()
+        X_win['predicted_position'] = np.clip(np.rint(predictor.position_model.predict(X)), 1, 20)
+        predictor.win_prob_model.fit(X_win, (y == 1).astype(int))
+        
+        print(f"{cls.__name__} ({len(data)} training rows)")
+        compare('position_model', predictor.position_model, X)
+        compare('win_prob_model', predictor.win_prob_model, X_win)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import time
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_DIR = os.path.join(ROOT, 'backend', 'models')
+PAYLOADS = [
+    {'driver_id': driver, 'constructor_id': team, 'grid_position': grid}
+    for driver, team in [('VER', 'Red Bull Racing'), ('NOR', 'McLaren'), ('LEC', 'Ferrari'),
+                         ('HAM', 'Ferrari'), ('RUS', 'Mercedes'), ('PIA', 'McLaren')]
+    for grid in (1, 4, 9, 15)
+]
+
+
+def _request(conn, method, path, body=None):
+    headers = {'Content-Type': 'application/json'} if body is not None else {}
+    conn.request(method, path, body=body, headers=headers)
+    response = conn.getresponse()
+    response.read()
+    return response.status
+
+
+def _client(port, duration, concurrency, results):
+    # One client process drives `concurrency` keep-alive connections round-robin,
+    # so the load generator itself stays off the GIL of the other clients.
+    conns = [http.client.HTTPConnection('127.0.0.1', port, timeout=30) for _ in range(concurrency)]
+    bodies = [json.dumps(p) for p in PAYLOADS]
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    i = 0
+    while time.perf_counter() < deadline:
+        conn = conns[i % concurrency]
+        start = time.perf_counter()
+        try:
+            if _request(conn, 'POST', '/predict', bodies[i % len(bodies)]) != 200:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+        latencies.append(time.perf_counter() - start)
+        i += 1
+    results.put((latencies, errors))
+
+
+def _worker_pids(server_pid, workers):
+    # With one worker uvicorn serves from the server process itself.
+    if workers == 1:
+        return [server_pid]
+    try:
+        with open(f'/proc/{server_pid}/task/{server_pid}/children') as f:
+            children = [int(child) for child in f.read().split()]
+    except OSError:
+        return []
+    pids = []
+    for pid in children:
+        try:
+            with open(f'/proc/{pid}/cmdline', 'rb') as f:
+                if b'resource_tracker' in f.read():
+                    continue
+        except OSError:
+            continue
+        pids.append(pid)
+    return pids
+
+
+def _memory_kb(pid, model_dir):
+    # Total and model-artifact (RSS, PSS) from smaps. PSS splits shared pages
+    # between the processes mapping them, so it is what each worker really costs.
+    total = [0, 0]
+    model_pages = [0, 0]
+    in_model = False
+    try:
+        with open(f'/proc/{pid}/smaps') as f:
+            for line in f:
+                parts = line.split()
+                if not parts[0].endswith(':'):
+                    in_model = len(parts) >= 6 and parts[5].startswith(model_dir)
+                elif parts[0] in ('Rss:', 'Pss:'):
+                    i = 0 if parts[0] == 'Rss:' else 1
+                    total[i] += int(parts[1])
+                    if in_model:
+                        model_pages[i] += int(parts[1])
+    except OSError:
+        pass
+    return total, model_pages
+
+
+def _wait_ready(port, workers, timeout=120):
+    # Connections are spread across workers, so require a run of ready answers.
+    deadline = time.time() + timeout
+    streak = 0
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            streak = streak + 1 if _request(conn, 'GET', '/ready') == 200 else 0
+            conn.close()
+        except OSError:
+            streak = 0
+        if streak >= 4 * workers:
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def run(workers, port, duration, clients, concurrency):
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'backend.serve', '--workers', str(workers), '--port', str(port),
+         '--host', '127.0.0.1'],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        if not _wait_ready(port, workers):
+            raise RuntimeError(f"Server with {workers} worker(s) did not become ready")
+
+        worker_pids = _worker_pids(server.pid, workers)
+
+        results = multiprocessing.Queue()
+        procs = [
+            multiprocessing.Process(target=_client, args=(port, duration, concurrency, results))
+            for _ in range(clients)
+        ]
+        for proc in procs:
+            proc.start()
+        collected = [results.get() for _ in procs]
+        for proc in procs:
+            proc.join()
+
+        memory = [_memory_kb(pid, MODEL_DIR) for pid in worker_pids]
+    finally:
+        server.send_signal(signal.SIGINT)
+        try:
+            server.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+    latencies = np.concatenate([np.array(l) for l, _ in collected]) * 1e3
+    return {
+        'workers': workers,
+        'requests': int(latencies.size),
+        'errors': sum(e for _, e in collected),
+        'throughput_rps': latencies.size / duration,
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'worker_rss_mb': [round(total[0] / 1024, 1) for total, _ in memory],
+        'worker_pss_mb': [round(total[1] / 1024, 1) for total, _ in memory],
+        'model_rss_mb': [round(model_pages[0] / 1024, 2) for _, model_pages in memory],
+        'model_pss_mb': [round(model_pages[1] / 1024, 2) for _, model_pages in memory]
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="/predict throughput across uvicorn worker counts")
+    parser.add_argument('--workers', default='1,2,4,8')
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--clients', type=int, default=4, help="load generator processes")
+    parser.add_argument('--concurrency', type=int, default=4, help="connections per client")
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    print(f"CPUs: {os.cpu_count()}, load: {args.clients} clients x {args.concurrency} connections, "
+          f"{args.duration:.0f}s per run")
+    baseline = None
+    for workers in [int(w) for w in args.workers.split(',')]:
+        r = run(workers, args.port, args.duration, args.clients, args.concurrency)
+        baseline = baseline or r['throughput_rps']
+        print(f"  {workers} worker(s): {r['throughput_rps']:8.0f} req/s ({r['throughput_rps'] / baseline:.2f}x), "
+              f"p50 {r['p50_ms']:.2f} ms, p99 {r['p99_ms']:.2f} ms, errors {r['errors']}")
+        print(f"      per-worker RSS {r['worker_rss_mb']} MB, PSS {r['worker_pss_mb']} MB "
+              f"(total PSS {sum(r['worker_pss_mb']):.1f} MB)")
+        print(f"      model arrays per worker: RSS {r['model_rss_mb']} MB, PSS {r['model_pss_mb']} MB")
+
+
+if __name__ == "__main__":
+    main()
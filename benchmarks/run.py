@@ -0,0 +1,367 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from backend import model
+from backend.data_collector import F1DataCollector
+from backend.model import RacePredictor
+from benchmarks.synthetic import synthetic_race_data
+
+warnings.filterwarnings('ignore')
+
+# Offline regression suite: every case runs on synthetic data shaped like
+# collect_historical_data output, and results are written as JSON records
+# that --compare checks against a saved baseline.
+#
+#   python -m benchmarks.run                      full run -> benchmarks/results/latest.json
+#   python -m benchmarks.run --quick --suites predict,api
+#   python -m benchmarks.run --compare benchmarks/results/baseline.json
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+# Metrics where a larger value is better; everything else is a cost.
+HIGHER_IS_BETTER = {'rows_per_second', 'requests_per_second', 'predictions_per_second'}
+
+
+def record(results, suite, case, metric, value, unit, **params):
+    results.append({
+        'suite': suite, 'case': case, 'metric': metric,
+        'value': float(value), 'unit': unit, 'params': params
+    })
+    shown = ', '.join(f"{k}={v}" for k, v in params.items())
+    print(f"  {suite}/{case} {metric}: {value:.6g} {unit}" + (f" ({shown})" if shown else ""))
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def quiet(fn, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+def percentiles(latencies):
+    latencies = np.asarray(latencies)
+    return np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+class Context:
+    # Shared between suites: one featured dataset and one trained predictor
+    # per run, saved as an artifact in a temporary directory.
+    def __init__(self, quick, tmp):
+        self.quick = quick
+        self.tmp = tmp
+        self.collector = F1DataCollector.__new__(F1DataCollector)
+        self._predictor = None
+
+    def featured(self, seasons):
+        return self.collector.engineer_features(synthetic_race_data(seasons=seasons))
+
+    def predictor(self):
+        if self._predictor is None:
+            predictor = RacePredictor(model_path=os.path.join(self.tmp, 'race_predictor_bench'))
+            quiet(predictor.train, self.featured(1 if self.quick else 3))
+            self._predictor = predictor
+        return self._predictor
+
+    def entries(self, n):
+        predictor = self.predictor()
+        drivers = list(predictor.driver_stats)
+        return [
+            {'driver': drivers[i % len(drivers)], 'team': predictor.driver_stats[drivers[i % len(drivers)]]['team'],
+             'grid': i % 20 + 1}
+            for i in range(n)
+        ]
+
+
+def suite_features(ctx, results):
+    for seasons in ((1, 5) if ctx.quick else (1, 5, 10, 20, 30)):
+        data = synthetic_race_data(seasons=seasons)
+        _, seconds = best_of(lambda: ctx.collector.engineer_features(data), 1 if seasons >= 20 else 3)
+        record(results, 'features', 'engineer_features', 'seconds', seconds, 's', seasons=seasons, rows=len(data))
+        record(results, 'features', 'engineer_features', 'rows_per_second', len(data) / seconds, 'rows/s',
+               seasons=seasons)
+
+
+def suite_train(ctx, results):
+    for seasons in ((1,) if ctx.quick else (1, 5)):
+        data = ctx.featured(seasons)
+        predictor = RacePredictor(model_path=os.path.join(ctx.tmp, f'train_{seasons}'))
+        start = time.perf_counter()
+        metrics = quiet(predictor.train, data)
+        record(results, 'train', 'race_predictor', 'seconds', time.perf_counter() - start, 's',
+               seasons=seasons, rows=len(data))
+        for stage, seconds in metrics['stage_seconds'].items():
+            record(results, 'train', f'stage_{stage}', 'seconds', seconds, 's', seasons=seasons)
+        record(results, 'train', 'race_predictor', 'mae', metrics['mae'], 'positions', seasons=seasons)
+
+
+def suite_artifact(ctx, results):
+    path = ctx.predictor().model_path
+    loads = []
+    for _ in range(5):
+        predictor = RacePredictor(model_path=path)
+        start = time.perf_counter()
+        quiet(predictor._ensure_loaded)
+        loads.append(time.perf_counter() - start)
+    record(results, 'artifact', 'load', 'seconds', min(loads), 's')
+    start = time.perf_counter()
+    quiet(predictor.load)
+    record(results, 'artifact', 'warm_up', 'seconds', time.perf_counter() - start, 's')
+
+
+def suite_predict(ctx, results):
+    predictor = ctx.predictor()
+    entries = ctx.entries(200)
+    repeat = 2 if ctx.quick else 5
+
+    for backend in ('sklearn', 'compiled'):
+        predictor.use_inference_backend(backend)
+        predictor.use_prediction_cache = False
+        latencies = []
+        for _ in range(repeat):
+            for entry in entries:
+                start = time.perf_counter()
+                predictor.predict(entry['driver'], entry['team'], entry['grid'])
+                latencies.append(time.perf_counter() - start)
+        p50, p99 = percentiles(latencies)
+        record(results, 'predict', 'single', 'p50_ms', p50 * 1e3, 'ms', backend=backend, cache=False)
+        record(results, 'predict', 'single', 'p99_ms', p99 * 1e3, 'ms', backend=backend, cache=False)
+
+        for size in (20, 1000):
+            batch = ctx.entries(size)
+            _, seconds = best_of(lambda: predictor.predict_grid(batch), repeat)
+            record(results, 'predict', f'grid_{size}', 'seconds', seconds, 's', backend=backend)
+            record(results, 'predict', f'grid_{size}', 'predictions_per_second', size / seconds, 'predictions/s',
+                   backend=backend)
+
+    predictor.use_inference_backend('sklearn')
+    predictor.use_prediction_cache = True
+    for entry in entries:
+        predictor.predict(entry['driver'], entry['team'], entry['grid'])
+    _, seconds = best_of(lambda: [predictor.predict(e['driver'], e['team'], e['grid']) for e in entries], repeat)
+    record(results, 'predict', 'single', 'cache_hit_us', seconds / len(entries) * 1e6, 'us', cache=True)
+
+
+async def _drive(app, payloads, requests, concurrency):
+    import httpx
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        async def worker(offset):
+            for i in range(offset, requests, concurrency):
+                start = time.perf_counter()
+                response = await client.post('/predict', json=payloads[i % len(payloads)])
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    raise RuntimeError(f"/predict returned {response.status_code}: {response.text}")
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+        return latencies, time.perf_counter() - start
+
+
+def suite_api(ctx, results):
+    # In-process through the ASGI app (routing, validation, middleware,
+    # threadpool dispatch), without sockets or a server.
+    from backend.main import app
+    predictor = ctx.predictor()
+    previous = model.swap_predictor(predictor)
+    # Keep get_predictor() from following CURRENT to the published model.
+    check_seconds, model.POINTER_CHECK_SECONDS = model.POINTER_CHECK_SECONDS, float('inf')
+    try:
+        payloads = [
+            {'driver_id': e['driver'], 'constructor_id': e['team'], 'grid_position': e['grid']}
+            for e in ctx.entries(200)
+        ]
+        requests = 300 if ctx.quick else 2000
+        for cache in (False, True):
+            predictor.use_prediction_cache = cache
+            for concurrency in (1, 16):
+                latencies, elapsed = asyncio.run(_drive(app, payloads, requests, concurrency))
+                p50, p99 = percentiles(latencies)
+                params = {'concurrency': concurrency, 'cache': cache, 'backend': predictor.inference_backend}
+                record(results, 'api', 'predict', 'requests_per_second', requests / elapsed, 'req/s', **params)
+                record(results, 'api', 'predict', 'p50_ms', p50 * 1e3, 'ms', **params)
+                record(results, 'api', 'predict', 'p99_ms', p99 * 1e3, 'ms', **params)
+    finally:
+        model.POINTER_CHECK_SECONDS = check_seconds
+        model.swap_predictor(previous)
+
+
+# Startup is measured in fresh interpreters, so nothing this process has
+# already imported counts: import time, artifact load and first prediction.
+SERVING_PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+from backend import main, model
+imported = time.perf_counter()
+predictor = model.RacePredictor(model_path=sys.argv[1])
+predictor._ensure_loaded()
+loaded = time.perf_counter()
+predictor.predict(str(predictor.le_driver.classes_[0]), str(predictor.le_team.classes_[0]), 5)
+done = time.perf_counter()
+print(json.dumps({
+    'import': imported - start, 'load': loaded - imported, 'first_predict': done - loaded,
+    'heavy': [name for name in sys.argv[2:] if name in sys.modules]
+}))
+'''
+
+# Training-only dependencies a process serving from an artifact must not load.
+HEAVY_MODULES = ('sklearn', 'scipy', 'joblib', 'fastf1')
+
+
+def import_times(statement):
+    # -X importtime self microseconds summed per top-level package, so each
+    # module's own import cost is charged to the package it belongs to.
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], cwd=ROOT,
+                            capture_output=True, text=True, check=True).stderr
+    totals = {}
+    for line in output.splitlines():
+        parts = line.split('|')
+        self_us = parts[0].split(':')[-1].strip()
+        if len(parts) != 3 or not self_us.isdigit():
+            continue
+        package = parts[2].strip().split('.')[0]
+        totals[package] = totals.get(package, 0) + int(self_us)
+    return totals
+
+
+def suite_startup(ctx, results):
+    repeat = 2 if ctx.quick else 5
+    runs = [import_times('import backend.main') for _ in range(repeat)]
+    best = min(runs, key=lambda totals: sum(totals.values()))
+    record(results, 'startup', 'import_backend_main', 'seconds', sum(best.values()) / 1e6, 's')
+    for package, micros in sorted(best.items(), key=lambda item: -item[1])[:8]:
+        record(results, 'startup', f'import_{package}', 'seconds', micros / 1e6, 's')
+
+    path = ctx.predictor().model_path
+    probes = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', SERVING_PROBE, path, *HEAVY_MODULES], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout
+        probes.append(json.loads(output.splitlines()[-1]))
+    for stage in ('import', 'load', 'first_predict'):
+        record(results, 'startup', f'cold_{stage}', 'seconds', min(probe[stage] for probe in probes), 's')
+    heavy = sorted({name for probe in probes for name in probe['heavy']})
+    if heavy:
+        raise RuntimeError(f"serving from an artifact imported {', '.join(heavy)}")
+
+
+SUITES = {
+    'features': suite_features,
+    'train': suite_train,
+    'artifact': suite_artifact,
+    'predict': suite_predict,
+    'api': suite_api,
+    'startup': suite_startup,
+}
+
+
+def environment():
+    import pandas
+    import sklearn
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pandas.__version__,
+        'sklearn': sklearn.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count()
+    }
+
+
+def _key(entry):
+    return (entry['suite'], entry['case'], entry['metric'], json.dumps(entry['params'], sort_keys=True))
+
+
+def compare(results, baseline_path, tolerance):
+    with open(baseline_path) as f:
+        baseline = {_key(entry): entry for entry in json.load(f)['results']}
+
+    regressions = []
+    for entry in results:
+        before = baseline.get(_key(entry))
+        if before is None or before['value'] <= 0 or entry['metric'] in ('mae',):
+            continue
+        ratio = entry['value'] / before['value']
+        slower = 1 / ratio if entry['metric'] in HIGHER_IS_BETTER else ratio
+        if slower > 1 + tolerance:
+            regressions.append((entry, before['value'], slower))
+
+    for entry, before, slower in regressions:
+        print(f"REGRESSION {entry['suite']}/{entry['case']} {entry['metric']} {entry['params']}: "
+              f"{before:.6g} -> {entry['value']:.6g} {entry['unit']} ({slower:.2f}x worse)")
+    if not regressions:
+        print(f"No regressions beyond {tolerance:.0%} against {baseline_path}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark suite with JSON output")
+    parser.add_argument('--suites', default=','.join(SUITES),
+                        help=f"comma-separated subset of {', '.join(SUITES)}")
+    parser.add_argument('--quick', action='store_true', help="smaller sizes, for CI smoke runs")
+    parser.add_argument('--output', default=os.path.join(RESULTS_DIR, 'latest.json'))
+    parser.add_argument('--compare', metavar='BASELINE', help="fail on regressions against a previous run")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed slowdown before --compare reports a regression")
+    args = parser.parse_args(argv)
+
+    names = [name.strip() for name in args.suites.split(',') if name.strip()]
+    unknown = [name for name in names if name not in SUITES]
+    if unknown:
+        parser.error(f"unknown suite(s): {', '.join(unknown)}")
+
+    results = []
+    started = time.time()
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = Context(args.quick, tmp)
+        for name in names:
+            print(f"[{name}]")
+            start = time.perf_counter()
+            SUITES[name](ctx, results)
+            print(f"  ({time.perf_counter() - start:.1f}s)")
+
+    report = {
+        'created_at': started,
+        'quick': args.quick,
+        'suites': names,
+        'environment': environment(),
+        'results': results
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=1)
+    print(f"Wrote {len(results)} results to {args.output}")
+
+    if args.compare:
+        return 1 if compare(results, args.compare, args.tolerance) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+POINTS = [25, 18, 15, 12, 10, 8, 6, 4, 2, 1]
+STATUSES = ['Finished', '+1 Lap', '+2 Laps', 'Retired', 'Collision', 'Engine']
+
+
+def synthetic_race_data(seasons=1, rounds=22, drivers=20, start_year=2025, seed=0):
+    # Race rows shaped like F1DataCollector.collect_historical_data output.
+    rng = np.random.default_rng(seed)
+    teams = [f'Team {i}' for i in range(drivers // 2)]
+    pool = [f'D{i:03d}' for i in range(drivers * 3)]
+    skill = rng.normal(0, 1, len(pool))
+
+    rows = []
+    roster = list(rng.choice(len(pool), drivers, replace=False))
+    for year in range(start_year, start_year + seasons):
+        # A couple of seats change hands every season.
+        for _ in range(2):
+            seat = rng.integers(drivers)
+            free = [d for d in range(len(pool)) if d not in roster]
+            roster[seat] = rng.choice(free)
+
+        for round_num in range(1, rounds + 1):
+            pace = skill[roster] + rng.normal(0, 0.8, drivers)
+            grid = np.argsort(np.argsort(-pace)) + 1
+            race_pace = pace + rng.normal(0, 0.6, drivers)
+            finish = np.argsort(np.argsort(-race_pace)) + 1
+            q1 = 80 - pace + rng.normal(0, 0.2, drivers)
+
+            for seat, driver_idx in enumerate(roster):
+                pos = int(finish[seat])
+                status = STATUSES[0] if pos <= 12 else STATUSES[rng.integers(len(STATUSES))]
+                rows.append({
+                    'year': year,
+                    'round': round_num,
+                    'event_name': f'Grand Prix {round_num}',
+                    'driver': pool[driver_idx],
+                    'driver_number': int(driver_idx) + 1,
+                    'team': teams[seat // 2],
+                    'grid_position': int(grid[seat]),
+                    'finish_position': pos,
+                    'points': float(POINTS[pos - 1]) if pos <= len(POINTS) else 0.0,
+                    'status': status,
+                    'q1_time': float(q1[seat]),
+                    'q2_time': float(q1[seat] - 0.3) if grid[seat] <= 15 else None,
+                    'q3_time': float(q1[seat] - 0.6) if grid[seat] <= 10 else None,
+                })
+
+    return pd.DataFrame(rows)
+
+
+def synthetic_laps(results, laps=57, seed=0):
+    # Race laps shaped like fastf1's session.laps: one- or two-stop races with
+    # tyre degradation, fuel burn-off, noise and a safety-car spell.
+    rng = np.random.default_rng(seed)
+    drivers = results['Abbreviation'].to_numpy()
+    n = len(drivers)
+    lap = np.tile(np.arange(1, laps + 1), n)
+    driver = np.repeat(drivers, laps)
+    offset = np.repeat(results['Position'].to_numpy() * 0.08, laps)
+
+    stops = rng.integers(1, 3, n)
+    first_stop = rng.integers(laps // 4, laps // 2, n)
+    second_stop = np.where(stops == 2, first_stop + rng.integers(10, laps // 3, n), laps + 1)
+    pit_laps = np.column_stack([first_stop, second_stop])
+    stint = 1 + (lap[:, None] > np.repeat(pit_laps, laps, axis=0)).sum(axis=1)
+    stint_start = np.where(stint == 1, 0, np.where(stint == 2, np.repeat(first_stop, laps), np.repeat(second_stop, laps)))
+    tyre_life = lap - stint_start
+    degradation = np.repeat(rng.uniform(0.03, 0.09, n), laps)
+
+    seconds = 92 + offset + degradation * tyre_life - 0.03 * lap + rng.normal(0, 0.3, n * laps)
+    pit_in = lap == np.repeat(first_stop, laps)
+    pit_in |= lap == np.repeat(second_stop, laps)
+    pit_out = np.r_[False, pit_in[:-1]] & (lap > 1)
+    seconds += np.where(pit_in | pit_out, 11.0, 0.0)
+    safety_car = np.isin(lap, np.arange(20, 24))
+    seconds += np.where(safety_car, 25.0, 0.0)
+    seconds[lap == 1] += 5.0
+
+    pit_time = pd.to_timedelta(lap * 92.0, unit='s')
+    return pd.DataFrame({
+        'Driver': driver,
+        'LapNumber': lap.astype(float),
+        'LapTime': pd.to_timedelta(seconds, unit='s'),
+        'Stint': stint.astype(float),
+        'TyreLife': tyre_life.astype(float),
+        'PitInTime': pit_time.where(pit_in),
+        'PitOutTime': pit_time.where(pit_out),
+        'TrackStatus': np.where(safety_car, '4', '1'),
+        'IsAccurate': ~(pit_in | pit_out | (lap == 1)),
+    })
+
+
+class SyntheticSession:
+    def __init__(self, provider, key, results):
+        self._provider = provider
+        self._key = key
+        self._results = results
+        self.results = None
+        self.laps = None
+
+    def load(self, laps=True, **kwargs):
+        time.sleep(self._provider.latency)
+        if self._provider._take_failure(self._key):
+            raise ConnectionError("synthetic transient failure")
+        self.results = self._results
+        if laps and self._key[2] == 'R':
+            year, round_num, _ = self._key
+            self.laps = synthetic_laps(self._results, seed=year * 100 + round_num)
+
+
+# Offline stand-in for the fastf1 module (get_event_schedule/get_session).
+class SyntheticSessionProvider:
+    def __init__(self, seasons=1, rounds=22, drivers=20, start_year=2025, latency=0.0,
+                 failures_per_session=0, seed=0):
+        self.data = synthetic_race_data(seasons, rounds, drivers, start_year, seed)
+        self.latency = latency
+        self.failures_per_session = failures_per_session
+        self.session_loads = 0
+        self._failures = {}
+        self._lock = threading.Lock()
+
+    def _take_failure(self, key):
+        with self._lock:
+            remaining = self._failures.setdefault(key, self.failures_per_session)
+            if remaining > 0:
+                self._failures[key] = remaining - 1
+                return True
+            return False
+
+    def get_event_schedule(self, year):
+        events = self.data[self.data['year'] == year].drop_duplicates('round')
+        event_dates = pd.to_datetime([f'{year}-03-01'] * len(events)) \
+            + pd.to_timedelta(events['round'].to_numpy() * 14, unit='D')
+        return pd.DataFrame({
+            'RoundNumber': events['round'].to_numpy(),
+            'EventName': events['event_name'].to_numpy(),
+            'EventFormat': 'conventional',
+            'EventDate': event_dates,
+            'Session1Date': event_dates - pd.Timedelta(days=2) + pd.Timedelta(hours=12),
+            'Country': 'Synthetic',
+            'Location': 'Synthetic',
+        })
+
+    def get_session(self, year, round_num, session_type):
+        with self._lock:
+            self.session_loads += 1
+        rows = self.data[(self.data['year'] == year) & (self.data['round'] == round_num)]
+        seconds = lambda col: pd.to_timedelta(rows[col], unit='s')
+        results = pd.DataFrame({
+            'DriverNumber': rows['driver_number'].astype(str).to_numpy(),
+            'Abbreviation': rows['driver'].to_numpy(),
+            'DriverId': rows['driver'].str.lower().to_numpy(),
+            'BroadcastName': ('X ' + rows['driver']).to_numpy(),
+            'TeamName': rows['team'].to_numpy(),
+            'TeamId': rows['team'].str.lower().str.replace(' ', '_').to_numpy(),
+            'Position': rows['finish_position'].astype(float).to_numpy(),
+            'GridPosition': rows['grid_position'].astype(float).to_numpy(),
+            'Points': rows['points'].to_numpy(),
+            'Status': rows['status'].to_numpy(),
+            'Q1': seconds('q1_time').to_numpy(),
+            'Q2': seconds('q2_time').to_numpy(),
+            'Q3': seconds('q3_time').to_numpy(),
+        })
+        if session_type == 'Q':
+            results = results.sort_values('GridPosition').reset_index(drop=True)
+        return SyntheticSession(self, (year, round_num, session_type), results)
@@ -12,6 +12,12 @@ else
     exit 1
 fi
 
-# Run uvicorn
-echo "Starting F1 Predictor Backend..."
-uvicorn backend.main:app --reload
+# Run uvicorn: --prod serves with several workers sharing one memory-mapped model
+if [ "$1" = "--prod" ]; then
+    WORKERS="${WORKERS:-$(nproc)}"
+    echo "Starting F1 Predictor Backend with $WORKERS workers..."
+    python -m backend.serve --workers "$WORKERS"
+else
+    echo "Starting F1 Predictor Backend..."
+    uvicorn backend.main:app --reload
+fi
@@ -0,0 +1,23 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def featured_data():
+    from backend.data_collector import F1DataCollector
+    from benchmarks.synthetic import synthetic_race_data
+    collector = F1DataCollector.__new__(F1DataCollector)
+    return collector.engineer_features(synthetic_race_data(seasons=1))
+
+
+@pytest.fixture(scope='session')
+def trained_predictor(featured_data, tmp_path_factory):
+    # One small model for the whole run, saved as an artifact.
+    from backend.model import RacePredictor
+    predictor = RacePredictor(model_path=str(tmp_path_factory.mktemp('models') / 'race_predictor_test'))
+    predictor.train(featured_data)
+    return predictor
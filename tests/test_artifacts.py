@@ -0,0 +1,78 @@
+import os
+
+import numpy as np
+import pytest
+
+from backend.artifacts import FittedLabels, is_artifact, load_artifact, save_artifact
+from backend.model import RacePredictor
+from backend.tree_engine import CompiledForest
+
+
+def entries(data):
+    lineup = data.drop_duplicates('driver')
+    return [(row.driver, row.team, grid) for grid, row in enumerate(lineup.itertuples(), start=1)]
+
+
+def test_trained_model_is_saved_as_artifact(trained_predictor):
+    path = trained_predictor.model_path
+    assert is_artifact(path)
+    assert not any(name.endswith('.tmp') for name in os.listdir(os.path.dirname(path)))
+
+
+def test_artifact_round_trip(trained_predictor, featured_data):
+    artifact = load_artifact(trained_predictor.model_path)
+    X, _ = trained_predictor._feature_matrix(
+        featured_data,
+        trained_predictor.le_driver.transform(featured_data['driver']),
+        trained_predictor.le_team.transform(featured_data['team'])
+    )
+
+    position = artifact['forests']['position_model']
+    assert isinstance(position, CompiledForest)
+    np.testing.assert_allclose(position.predict(X), trained_predictor.position_model.predict(X), rtol=1e-9)
+    assert list(artifact['driver_classes']) == list(trained_predictor.le_driver.classes_)
+    assert list(artifact['team_classes']) == list(trained_predictor.le_team.classes_)
+    assert artifact['feature_names'] == list(trained_predictor.feature_names)
+    assert artifact['rounds'] == [tuple(r) for r in trained_predictor.trained_rounds]
+    assert artifact['manifest']['version'] == os.path.basename(trained_predictor.model_path)
+
+
+def test_loaded_predictor_predicts_like_trained_one(trained_predictor, featured_data, monkeypatch):
+    # Both predictors share a version, so cached results would be compared with themselves.
+    monkeypatch.setattr(trained_predictor, 'use_prediction_cache', False)
+    loaded = RacePredictor(model_path=trained_predictor.model_path)
+    assert loaded.load()
+    loaded.use_prediction_cache = False
+    for driver, team, grid in entries(featured_data):
+        assert loaded.predict(driver, team, grid) == trained_predictor.predict(driver, team, grid)
+
+
+def test_resaving_a_loaded_artifact(trained_predictor, featured_data, tmp_path):
+    loaded = RacePredictor(model_path=trained_predictor.model_path)
+    loaded.load()
+    loaded.use_prediction_cache = False
+    copy_path = save_artifact(loaded, str(tmp_path / 'copy'))
+    copy = RacePredictor(model_path=copy_path)
+    copy.load()
+    copy.use_prediction_cache = False
+    for driver, team, grid in entries(featured_data)[:5]:
+        assert copy.predict(driver, team, grid) == loaded.predict(driver, team, grid)
+
+
+def test_unsupported_format_is_rejected(trained_predictor, tmp_path):
+    import json
+    import shutil
+    path = tmp_path / 'old'
+    shutil.copytree(trained_predictor.model_path, path)
+    manifest = json.loads((path / 'manifest.json').read_text())
+    manifest['format_version'] = -1
+    (path / 'manifest.json').write_text(json.dumps(manifest))
+    with pytest.raises(ValueError):
+        load_artifact(str(path))
+
+
+def test_fitted_labels_transform():
+    labels = FittedLabels(['VER', 'HAM', 'ALO'])
+    assert list(labels.transform(['ALO', 'VER'])) == [2, 0]
+    with pytest.raises(ValueError):
+        labels.transform(['XXX'])
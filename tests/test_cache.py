@@ -0,0 +1,140 @@
+import threading
+import time
+
+import pytest
+
+from backend.cache import LRUCache, TTLCache
+
+
+def loader(value, ttl=60.0, calls=None):
+    def load():
+        if calls is not None:
+            calls.append(value)
+        return value, ttl
+    return load
+
+
+def test_ttl_cache_hit_until_expiry():
+    cache = TTLCache('test')
+    calls = []
+    assert cache.get_or_load('k', loader(1, calls=calls)) == 1
+    assert cache.get_or_load('k', loader(2, calls=calls)) == 1
+    assert calls == [1]
+
+    cache.get_or_load('expired', loader('old', ttl=0.0))
+    assert cache.get_or_load('expired', loader('new')) == 'new'
+    assert cache.stats()['hits'] == 1
+
+
+def test_ttl_cache_peek_keeps_expired_value_for_revalidation():
+    cache = TTLCache('test')
+    cache.get_or_load('k', loader('stale', ttl=0.0))
+    value, fresh, stored_at = cache.peek('k')
+    assert value == 'stale' and not fresh
+    assert stored_at <= time.time()
+    assert cache.peek('missing') is None
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache('test', maxsize=2)
+    cache.get_or_load('a', loader('a'))
+    cache.get_or_load('b', loader('b'))
+    cache.get_or_load('a', loader('unused'))
+    cache.get_or_load('c', loader('c'))
+
+    assert cache.peek('b') is None
+    assert cache.peek('a')[0] == 'a' and cache.peek('c')[0] == 'c'
+    stats = cache.stats()
+    assert stats['entries'] == 2 and stats['evictions'] == 1
+
+
+def test_ttl_cache_size_stays_bounded_over_distinct_keys():
+    cache = TTLCache('test', maxsize=8)
+    for key in range(1000):
+        cache.get_or_load(key, loader(key, ttl=0.0))
+    assert cache.stats()['entries'] == 8
+    assert cache.stats()['evictions'] == 992
+
+
+def test_ttl_cache_failed_load_is_not_cached():
+    cache = TTLCache('test')
+
+    def fail():
+        raise ValueError('boom')
+
+    with pytest.raises(ValueError):
+        cache.get_or_load('k', fail)
+    assert cache.get_or_load('k', loader('ok')) == 'ok'
+    assert cache.stats()['load_errors'] == 1
+
+
+def test_ttl_cache_coalesces_concurrent_misses():
+    cache = TTLCache('test')
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 'value', 60.0
+
+    results = []
+    owner = threading.Thread(target=lambda: results.append(cache.get_or_load('k', slow)))
+    owner.start()
+    started.wait(5)
+    waiter = threading.Thread(target=lambda: results.append(cache.get_or_load('k', slow)))
+    waiter.start()
+    while cache.stats()['coalesced'] == 0:
+        time.sleep(0.001)
+    release.set()
+    owner.join(5)
+    waiter.join(5)
+
+    assert results == ['value', 'value']
+    assert calls == [1]
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache('test', maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    stats = cache.stats()
+    assert stats['entries'] == 2 and stats['evictions'] == 1
+    assert stats['hits'] == 3 and stats['misses'] == 1
+
+
+def test_lru_cache_disabled_with_zero_size():
+    cache = LRUCache('test', maxsize=0)
+    cache.put('a', 1)
+    assert cache.get('a') is None
+
+
+def test_invalidate_clears_entries():
+    ttl = TTLCache('test')
+    ttl.get_or_load('a', loader('a'))
+    ttl.invalidate('a')
+    assert ttl.peek('a') is None
+
+    lru = LRUCache('test', maxsize=4)
+    lru.put('a', 1)
+    lru.invalidate()
+    assert lru.get('a') is None
+
+
+def test_ttl_cache_lookup_counts_fresh_hits_only():
+    cache = TTLCache('test')
+    assert cache.lookup('missing') is None
+    cache.get_or_load('fresh', loader('a'))
+    cache.get_or_load('stale', loader('b', ttl=0.0))
+
+    assert cache.lookup('fresh')[:2] == ('a', True)
+    assert cache.lookup('stale')[:2] == ('b', False)
+    stats = cache.stats()
+    assert stats['hits'] == 1 and stats['misses'] == 2
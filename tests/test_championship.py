@@ -0,0 +1,90 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from backend import championship, data_service
+
+
+def schedule(today, offsets):
+    # One round per offset (days from today's midnight).
+    dates = [today + pd.Timedelta(days=offset) for offset in offsets]
+    return pd.DataFrame({
+        'RoundNumber': list(range(1, len(offsets) + 1)),
+        'EventName': [f'Grand Prix {i}' for i in range(1, len(offsets) + 1)],
+        'EventDate': pd.to_datetime(dates),
+    })
+
+
+def round_results(data, round_num):
+    rows = data[data['round'] == round_num]
+    return pd.DataFrame({
+        'driver': rows['driver'].to_numpy(),
+        'team': rows['team'].to_numpy(),
+        'grid_position': rows['grid_position'].to_numpy(),
+        'finish_position': rows['finish_position'].to_numpy(),
+        'points': rows['points'].to_numpy(),
+    })
+
+
+@pytest.fixture
+def season(monkeypatch, featured_data):
+    # Two finished rounds, a race today without results yet, and one ahead.
+    today = pd.Timestamp(datetime.now().date())
+    published = {1: round_results(featured_data, 1), 2: round_results(featured_data, 2)}
+    state = {'schedule': schedule(today, [-14, -7, 0, 7]), 'results': published}
+
+    monkeypatch.setattr(data_service, 'get_event_schedule', lambda year: state['schedule'])
+    monkeypatch.setattr(
+        data_service, 'get_round_results',
+        lambda year, round_num, event_date: state['results'].get(int(round_num), round_results(featured_data, 0))
+    )
+    championship._projection_cache.invalidate()
+    championship._round_simulation_cache.invalidate()
+    yield state
+    championship._projection_cache.invalidate()
+    championship._round_simulation_cache.invalidate()
+
+
+def test_race_day_round_is_still_remaining(season, trained_predictor):
+    projection = championship.get_projection(trained_predictor, year=2025, n_sims=1000)
+
+    assert projection['completed_rounds'] == 2
+    assert [r['round'] for r in projection['remaining_rounds']] == [3, 4]
+    assert projection['drivers']
+    leader = projection['drivers'][0]
+    # two more races worth of points on top of the points so far
+    assert leader['current_points'] <= leader['expected_points'] <= leader['current_points'] + 2 * 26
+
+
+def test_completed_rounds_wait_for_the_end_of_race_day():
+    today = pd.Timestamp(datetime.now().date())
+    rounds = schedule(today, [-1, 0, 1])
+    now = today + pd.Timedelta(hours=15)
+    assert list(data_service.completed_rounds(rounds, now)['RoundNumber']) == [1]
+    assert list(data_service.remaining_rounds(rounds, now)['RoundNumber']) == [2, 3]
+
+
+def test_projection_without_published_results(season, trained_predictor):
+    season['results'] = {}
+    projection = championship.get_projection(trained_predictor, year=2025, n_sims=1000)
+    assert projection['completed_rounds'] == 2
+    assert projection['drivers'] == []
+
+
+def test_projection_before_the_season(season, trained_predictor):
+    season['schedule'] = schedule(pd.Timestamp(datetime.now().date()), [7, 14])
+    projection = championship.get_projection(trained_predictor, year=2025, n_sims=1000)
+    assert projection['completed_rounds'] == 0
+    assert len(projection['remaining_rounds']) == 2
+    assert projection['drivers'] == []
+
+
+def test_simulation_counts_snap_to_cached_sizes(season, trained_predictor):
+    assert championship.projection_simulations(1) == 1000
+    assert championship.projection_simulations(1001) == 5000
+    assert championship.projection_simulations(10 ** 9) == championship.PROJECTION_SIMULATIONS
+
+    for n_sims in (1, 7, 999, 1000):
+        assert championship.get_projection(trained_predictor, year=2025, n_sims=n_sims)['n_simulations'] == 1000
+    assert championship._projection_cache.stats()['entries'] == 1
@@ -0,0 +1,102 @@
+import weakref
+
+import pandas as pd
+import pytest
+
+from backend.data_collector import F1DataCollector
+from backend.round_store import to_typed_frame
+from benchmarks.bench_event_join import legacy_event_rows
+from benchmarks.synthetic import SyntheticSession, SyntheticSessionProvider
+
+
+class TrackingSession(SyntheticSession):
+    def load(self, **kwargs):
+        provider = self._provider
+        with provider._lock:
+            provider.load_args.append(kwargs)
+            alive = sum(ref() is not None for ref in provider.sessions)
+            provider.max_alive = max(provider.max_alive, alive)
+        super().load(**kwargs)
+
+
+class TrackingProvider(SyntheticSessionProvider):
+    # Records session load arguments and how many sessions are still alive.
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sessions = []
+        self.load_args = []
+        self.max_alive = 0
+
+    def get_session(self, year, round_num, session_type):
+        session = super().get_session(year, round_num, session_type)
+        session.__class__ = TrackingSession
+        with self._lock:
+            self.sessions.append(weakref.ref(session))
+        return session
+
+
+def test_collect_events_loads_results_only_and_releases_sessions(tmp_path):
+    provider = TrackingProvider(seasons=2, start_year=2010)
+    collector = F1DataCollector(cache_dir=str(tmp_path), session_provider=provider)
+    events = collector._list_events(2010, 2011)
+    frame = collector._collect_events(events, max_workers=2)
+
+    assert len(frame) == len(provider.data)
+    assert list(frame[['year', 'round']].drop_duplicates().itertuples(index=False, name=None)) == \
+        [(year, round_num) for year, round_num, _, _ in events]
+    assert all(args.get('laps') is False and args.get('telemetry') is False for args in provider.load_args)
+    # the event being assembled plus max_workers events queued behind it
+    assert provider.max_alive <= 2 * (2 + 1)
+    assert len(provider.sessions) == 2 * len(events)
+
+
+def test_collect_events_matches_single_worker(tmp_path):
+    provider = SyntheticSessionProvider(seasons=1, start_year=2010)
+    collector = F1DataCollector(cache_dir=str(tmp_path), session_provider=provider)
+    events = collector._list_events(2010, 2010)
+    pd.testing.assert_frame_equal(collector._collect_events(events, 1), collector._collect_events(events, 4))
+
+
+def test_lap_summaries_are_stored_per_round(tmp_path):
+    provider = SyntheticSessionProvider(seasons=1, rounds=3, start_year=2010)
+    collector = F1DataCollector(cache_dir=str(tmp_path), session_provider=provider)
+    reports = collector.collect_lap_summaries(2010, 2010)
+
+    assert [report['round'] for report in reports] == [1, 2, 3]
+    assert all(report['peak_mb'] is None for report in reports)
+    summaries = collector.lap_store().load(2010, 2010)
+    assert len(summaries) == 3 * 20
+    assert summaries['pit_stops'].between(1, 2).all()
+    assert summaries['degradation'].mean() > 0
+    # Already current, so nothing is reloaded.
+    assert collector.collect_lap_summaries(2010, 2010) == []
+
+
+@pytest.mark.parametrize('drivers', [20, 100])
+def test_event_rows_match_per_row_join(drivers):
+    provider = SyntheticSessionProvider(seasons=1, rounds=1, drivers=drivers)
+    quali = provider.get_session(2025, 1, 'Q')
+    race = provider.get_session(2025, 1, 'R')
+    quali.load(laps=False)
+    race.load(laps=False)
+    # A retirement without a classified position, a driver who didn't
+    # qualify and a duplicated qualifying row.
+    race_results = race.results.copy()
+    race_results.loc[0, 'Position'] = float('nan')
+    quali_results = quali.results[quali.results['Abbreviation'] != race_results['Abbreviation'].iloc[1]]
+    quali_results = pd.concat([quali_results, quali_results.iloc[[2]].assign(Q1=pd.NaT)], ignore_index=True)
+
+    merged = F1DataCollector._event_rows(2025, 1, 'Grand Prix 1', quali_results, race_results)
+    legacy = pd.DataFrame(legacy_event_rows(2025, 1, 'Grand Prix 1', quali_results, race_results))
+
+    assert len(merged) == drivers - 2
+    pd.testing.assert_frame_equal(to_typed_frame(merged), to_typed_frame(legacy))
+
+
+def test_event_rows_without_overlap():
+    provider = SyntheticSessionProvider(seasons=1, rounds=1)
+    race = provider.get_session(2025, 1, 'R')
+    race.load(laps=False)
+    quali_results = race.results.iloc[:0]
+    rows = F1DataCollector._event_rows(2025, 1, 'Grand Prix 1', quali_results, race.results)
+    assert rows.empty
@@ -0,0 +1,49 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pandas as pd
+
+from backend import data_service
+from backend.cache import TTLCache
+
+
+def test_serve_cached_works_after_shutdown():
+    cache = TTLCache('test')
+
+    def load():
+        return cache.get_or_load('key', lambda: ('value', 60.0))
+
+    for _ in range(2):
+        assert asyncio.run(data_service.serve_cached('test', cache, 'key', load)) == 'value'
+        data_service.shutdown()
+        cache.invalidate()
+    assert data_service._io_executor is None
+
+
+def test_serve_cached_counts_fresh_hits():
+    cache = TTLCache('test')
+
+    def load():
+        return cache.get_or_load('key', lambda: ('value', 60.0))
+
+    for _ in range(10):
+        assert asyncio.run(data_service.serve_cached('test_hits', cache, 'key', load)) == 'value'
+    stats = cache.stats()
+    assert stats['misses'] == 1
+    assert stats['hits'] == 9
+    assert stats['hit_rate'] == 0.9
+    data_service.shutdown()
+
+
+def test_round_results_load_only_the_classification(monkeypatch):
+    loads = []
+    results = pd.DataFrame({
+        'Abbreviation': ['VER'], 'TeamName': ['Red Bull'], 'GridPosition': [1], 'Position': [1], 'Points': [25]
+    })
+    session = SimpleNamespace(load=lambda **kwargs: loads.append(kwargs), results=results)
+    monkeypatch.setattr(data_service, '_fastf1', lambda: SimpleNamespace(get_session=lambda *args: session))
+
+    frame, _ = data_service._load_round_results(2024, 1, datetime(2024, 3, 2))
+    assert loads == [{'laps': False, 'telemetry': False, 'weather': False, 'messages': False}]
+    assert frame['driver'].tolist() == ['VER']
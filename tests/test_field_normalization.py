@@ -0,0 +1,48 @@
+import pytest
+
+from backend.model import RacePredictor, _capped_shares
+
+
+def field(podium_probabilities, win_probability=0.1):
+    return [{'win_probability': win_probability, 'podium_probability': p} for p in podium_probabilities]
+
+
+def normalized(podium_probabilities):
+    return RacePredictor()._normalize_field(field(podium_probabilities))
+
+
+@pytest.mark.parametrize('podium', [
+    [0.9, 0.1, 0.1],
+    [0.9, 0.2, 0.1, 0.05],
+    [0.9, 0.05, 0.04, 0.01, 0.01],
+    [0.95, 0.9, 0.05] + [0.01] * 17,
+    [0.3] * 20,
+    [0.6, 0.4],
+    [0.2],
+])
+def test_podium_shares_are_probabilities_summing_to_podium_places(podium):
+    shares = [r['field_podium_probability'] for r in normalized(podium)]
+    assert all(0.0 <= share <= 1.0 for share in shares)
+    assert sum(shares) == pytest.approx(min(3, len(podium)), abs=1e-3)
+
+
+def test_dominant_driver_is_capped_and_excess_redistributed():
+    shares = _capped_shares([0.9, 0.2, 0.1, 0.05], 3)
+    assert shares[0] == 1.0 and shares[1] == 1.0
+    # the remaining place splits 2:1 like the raw probabilities
+    assert shares[2] == pytest.approx(2 / 3)
+    assert shares[3] == pytest.approx(1 / 3)
+
+
+def test_uncapped_field_keeps_proportional_shares():
+    shares = _capped_shares([0.3, 0.3, 0.2, 0.2], 2)
+    assert list(shares) == pytest.approx([0.6, 0.6, 0.4, 0.4])
+
+
+def test_zero_probabilities_stay_zero():
+    assert [r['field_podium_probability'] for r in normalized([0.0, 0.0])] == [0.0, 0.0]
+
+
+def test_win_shares_sum_to_one():
+    results = normalized([0.5, 0.4, 0.3, 0.2])
+    assert sum(r['field_win_probability'] for r in results) == pytest.approx(1.0)
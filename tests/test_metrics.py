@@ -0,0 +1,43 @@
+from backend import main, metrics, model
+
+
+def test_cache_totals_are_exported_as_counters():
+    families = {name: kind for name, kind, _, _ in main._cache_metrics()}
+    assert families['f1_cache_hits_total'] == 'counter'
+    assert families['f1_cache_misses_total'] == 'counter'
+    assert families['f1_cache_evictions_total'] == 'counter'
+    assert families['f1_cache_entries'] == 'gauge'
+    assert families['f1_cache_hit_rate'] == 'gauge'
+    assert 'f1_cache_hits' not in families
+
+
+def test_render_exposition_format():
+    counter = metrics.Counter('test_events_total', 'Test events.', labels=('kind',))
+    histogram = metrics.Histogram('test_seconds', 'Test latency.', buckets=(0.1, 1.0))
+    counter.inc('a')
+    counter.inc('a', amount=2)
+    histogram.observe(0.5)
+    histogram.observe(5.0)
+
+    text = metrics.render()
+    assert '# TYPE test_events_total counter' in text
+    assert 'test_events_total{kind="a"} 3' in text
+    assert 'test_seconds_bucket{le="0.1"} 0' in text
+    assert 'test_seconds_bucket{le="1.0"} 1' in text
+    assert 'test_seconds_bucket{le="+Inf"} 2' in text
+    assert 'test_seconds_sum 5.5' in text
+    assert 'test_seconds_count 2' in text
+
+
+def test_model_info_reports_the_engine_in_use(trained_predictor, monkeypatch):
+    def backend_label(current):
+        monkeypatch.setattr(model, 'predictor', current)
+        info = {name: samples for name, _, _, samples in model._model_metrics()}['f1_model_info']
+        return info[0][0]['backend']
+
+    assert trained_predictor.inference_backend == 'sklearn'
+    assert backend_label(trained_predictor) == 'sklearn'
+    loaded = model.RacePredictor(model_path=trained_predictor.model_path)
+    loaded.use_inference_backend('sklearn')
+    assert loaded.load()
+    assert backend_label(loaded) == 'compiled'
@@ -0,0 +1,87 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from backend import model, training_jobs
+from backend.artifacts import save_artifact
+
+
+@pytest.fixture
+def artifact_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(model, 'ARTIFACT_DIR', str(tmp_path))
+    monkeypatch.setattr(model, 'CURRENT_POINTER', str(tmp_path / 'CURRENT'))
+    monkeypatch.setattr(model, 'POINTER_CHECK_SECONDS', 0.0)
+    previous = model.swap_predictor(model.RacePredictor(model_path=str(tmp_path / 'missing')))
+    yield tmp_path
+    model.swap_predictor(previous)
+
+
+def test_published_model_is_loaded_off_the_request_path(artifact_dir, trained_predictor, monkeypatch):
+    published = str(artifact_dir / 'race_predictor_new')
+    save_artifact(trained_predictor, published)
+    model.publish_model(published)
+
+    release = threading.Event()
+    load = model.RacePredictor.load
+
+    def slow_load(self):
+        release.wait(5)
+        return load(self)
+
+    monkeypatch.setattr(model.RacePredictor, 'load', slow_load)
+    old = model.get_predictor()
+    # The request that notices CURRENT changed keeps the old model.
+    assert model.get_predictor() is old
+    assert model._pointer_loading == published
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while model.get_predictor() is old and time.monotonic() < deadline:
+        time.sleep(0.01)
+    current = model.get_predictor()
+    assert current.model_path == published and current.ready
+    assert model._pointer_loading is None
+
+
+def test_training_lock_is_exclusive(tmp_path, monkeypatch):
+    if training_jobs.fcntl is None:
+        pytest.skip("needs fcntl")
+    monkeypatch.setattr(training_jobs, 'TRAINING_LOCK_PATH', str(tmp_path / '.training.lock'))
+    lock = training_jobs._acquire_training_lock()
+    with pytest.raises(RuntimeError):
+        training_jobs._acquire_training_lock()
+    training_jobs._release_training_lock(lock)
+    training_jobs._release_training_lock(training_jobs._acquire_training_lock())
+
+
+def finished_job(jobs, result):
+    future = Future()
+    future.set_result(result)
+    job_id = 'job'
+    jobs._jobs[job_id] = {'job_id': job_id, 'status': 'running'}
+    jobs._finish(job_id, future)
+    return jobs.get(job_id)
+
+
+def job_result(path):
+    return {'mode': 'full', 'mae': 1.0, 'rmse': 1.0, 'stage_seconds': {},
+            'version': os.path.basename(path), 'model_path': path}
+
+
+def test_finished_job_publishes_only_a_loadable_model(artifact_dir, trained_predictor):
+    jobs = training_jobs.TrainingJobs()
+    published = str(artifact_dir / 'race_predictor_trained')
+    save_artifact(trained_predictor, published)
+
+    broken = str(artifact_dir / 'race_predictor_broken')
+    job = finished_job(jobs, job_result(broken))
+    assert job['status'] == 'failed'
+    assert not os.path.exists(model.CURRENT_POINTER)
+
+    job = finished_job(jobs, job_result(published))
+    assert job['status'] == 'succeeded'
+    assert model.current_model_path() == published
+    assert model.get_predictor().model_path == published and model.get_predictor().ready
@@ -0,0 +1,73 @@
+import os
+import shutil
+
+import pytest
+
+from backend import model
+from backend.model import RacePredictor
+
+
+@pytest.fixture
+def cache():
+    model._prediction_cache.invalidate()
+    yield model._prediction_cache
+    model._prediction_cache.invalidate()
+
+
+def lineup(data):
+    return data.drop_duplicates('driver')[['driver', 'team']].itertuples(index=False)
+
+
+def copy_of(predictor, path):
+    shutil.copytree(predictor.model_path, path)
+    copy = RacePredictor(model_path=str(path))
+    assert copy.load()
+    return copy
+
+
+def test_repeated_predictions_hit(trained_predictor, featured_data, cache):
+    driver, team = next(lineup(featured_data))
+    hits = cache.hits
+    first = trained_predictor.predict(driver, team, 3)
+    assert trained_predictor.predict(driver, team, 3) == first
+    assert cache.hits == hits + 1
+
+
+def test_returned_dicts_do_not_alias_the_cache(trained_predictor, featured_data, cache):
+    driver, team = next(lineup(featured_data))
+    trained_predictor.predict(driver, team, 3)['note'] = 'annotated'
+    assert 'note' not in trained_predictor.predict(driver, team, 3)
+
+
+def test_new_model_version_does_not_see_old_entries(trained_predictor, featured_data, cache, tmp_path):
+    driver, team = next(lineup(featured_data))
+    trained_predictor.predict(driver, team, 3)
+    newer = copy_of(trained_predictor, tmp_path / 'race_predictor_next')
+    hits = cache.hits
+    newer.predict(driver, team, 3)
+    assert cache.hits == hits
+
+
+def test_same_named_artifacts_in_other_directories_do_not_share_entries(trained_predictor, featured_data, cache, tmp_path):
+    driver, team = next(lineup(featured_data))
+    trained_predictor.predict(driver, team, 3)
+    twin = copy_of(trained_predictor, tmp_path / os.path.basename(trained_predictor.model_path))
+    assert twin.version == trained_predictor.version
+    hits = cache.hits
+    twin.predict(driver, team, 3)
+    assert cache.hits == hits
+
+
+def test_warmed_entries_match_uncached_predictions(trained_predictor, cache, monkeypatch):
+    assert trained_predictor.warm_prediction_cache(grid_slots=5) > 0
+    hits = cache.hits
+    warmed = [
+        (driver, team, grid, trained_predictor.predict(driver, team, grid))
+        for driver in trained_predictor.driver_stats
+        for team in [trained_predictor.driver_stats.value(driver, 'team')]
+        for grid in range(1, 6)
+    ]
+    assert cache.hits == hits + len(warmed)
+    monkeypatch.setattr(trained_predictor, 'use_prediction_cache', False)
+    for driver, team, grid, result in warmed:
+        assert result == pytest.approx(trained_predictor.predict(driver, team, grid))
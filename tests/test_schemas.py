@@ -0,0 +1,15 @@
+import pytest
+from pydantic import ValidationError
+
+from backend.schemas import MAX_ENTRIES, GridPredictionInput, RaceSimulationInput
+
+
+def entry(i):
+    return {'driver_id': f'driver_{i}', 'constructor_id': 'team', 'grid_position': i + 1}
+
+
+@pytest.mark.parametrize('schema', [GridPredictionInput, RaceSimulationInput])
+def test_entries_are_capped(schema):
+    assert len(schema(entries=[entry(i) for i in range(MAX_ENTRIES)]).entries) == MAX_ENTRIES
+    with pytest.raises(ValidationError):
+        schema(entries=[entry(i) for i in range(MAX_ENTRIES + 1)])
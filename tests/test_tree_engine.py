@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+
+from backend.tree_engine import CompiledForest
+
+FEATURES = ['a', 'b', 'c', 'd']
+
+
+def training_data(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(n, len(FEATURES))), columns=FEATURES)
+    # Integer-valued columns put many samples exactly on split thresholds.
+    X['c'] = rng.integers(1, 21, n).astype(float)
+    y = X['a'] * 2 + np.sin(X['b']) + X['c'] * 0.3 + rng.normal(0, 0.1, n)
+    return X, y
+
+
+@pytest.fixture(scope='module')
+def data():
+    return training_data()
+
+
+@pytest.mark.parametrize('model', [
+    RandomForestRegressor(n_estimators=20, max_depth=6, random_state=0),
+    RandomForestRegressor(n_estimators=5, random_state=0),
+    GradientBoostingRegressor(n_estimators=30, max_depth=3, random_state=0),
+])
+def test_compiled_forest_matches_sklearn(model, data):
+    X, y = data
+    model.fit(X, y)
+    engine = CompiledForest.from_estimator(model)
+    X_test, _ = training_data(n=300, seed=1)
+
+    np.testing.assert_allclose(engine.predict(X_test), model.predict(X_test), rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(engine.predict(X.iloc[:1]), model.predict(X.iloc[:1]), rtol=1e-9, atol=1e-9)
+
+
+def test_compiled_forest_reorders_columns_by_feature_name(data):
+    X, y = data
+    model = RandomForestRegressor(n_estimators=10, max_depth=5, random_state=0).fit(X, y)
+    engine = CompiledForest.from_estimator(model)
+    np.testing.assert_allclose(engine.predict(X[FEATURES[::-1]]), model.predict(X), rtol=1e-9, atol=1e-9)
+
+
+def test_compiled_forest_chunks_large_batches(data, monkeypatch):
+    X, y = data
+    model = RandomForestRegressor(n_estimators=10, max_depth=5, random_state=0).fit(X, y)
+    engine = CompiledForest.from_estimator(model)
+    monkeypatch.setattr(CompiledForest, 'CHUNK_ROWS', 7)
+    np.testing.assert_allclose(engine.predict(X), model.predict(X), rtol=1e-9, atol=1e-9)
+    assert engine.predict(X.iloc[:0]).shape == (0,)
+
+
+def test_compiled_forest_array_round_trip(data):
+    X, y = data
+    model = GradientBoostingRegressor(n_estimators=10, random_state=0).fit(X, y)
+    engine = CompiledForest.from_estimator(model)
+    restored = CompiledForest.from_arrays(*engine.to_arrays())
+    np.testing.assert_array_equal(restored.predict(X), engine.predict(X))
+
+
+def test_merge_averages_over_the_combined_trees(data):
+    X, y = data
+    old = CompiledForest.from_estimator(RandomForestRegressor(n_estimators=10, max_depth=5, random_state=0).fit(X, y))
+    new = CompiledForest.from_estimator(RandomForestRegressor(n_estimators=4, max_depth=7, random_state=1).fit(X, y))
+
+    merged = old.merge(new)
+    assert merged.n_trees == 14 and merged.max_depth == 7
+    expected = np.hstack([old.predict_per_tree(X), new.predict_per_tree(X)])
+    np.testing.assert_allclose(merged.predict_per_tree(X), expected)
+    np.testing.assert_allclose(merged.predict(X), expected.mean(axis=1))
+
+
+def test_merge_drops_the_oldest_trees_past_max_trees(data):
+    X, y = data
+    old = CompiledForest.from_estimator(RandomForestRegressor(n_estimators=10, max_depth=5, random_state=0).fit(X, y))
+    new = CompiledForest.from_estimator(RandomForestRegressor(n_estimators=4, max_depth=5, random_state=1).fit(X, y))
+
+    merged = old.merge(new, max_trees=10)
+    assert merged.n_trees == 10
+    expected = np.hstack([old.predict_per_tree(X)[:, 4:], new.predict_per_tree(X)])
+    np.testing.assert_allclose(merged.predict_per_tree(X), expected)
+
+    replaced = old.merge(new, max_trees=4)
+    np.testing.assert_allclose(replaced.predict(X), new.predict(X))
+
+
+def test_merge_rejects_incompatible_forests(data):
+    X, y = data
+    forest = CompiledForest.from_estimator(RandomForestRegressor(n_estimators=3, random_state=0).fit(X, y))
+    boosted = CompiledForest.from_estimator(GradientBoostingRegressor(n_estimators=3, random_state=0).fit(X, y))
+    renamed = CompiledForest.from_estimator(
+        RandomForestRegressor(n_estimators=3, random_state=0).fit(X.rename(columns={'a': 'z'}), y)
+    )
+    with pytest.raises(ValueError):
+        forest.merge(boosted)
+    with pytest.raises(ValueError):
+        forest.merge(renamed)